@@ -1,8 +1,10 @@
 import streamlit as st
 from streamlit_js_eval import streamlit_js_eval
-import json
 import random
 
+from codec import decode_text, encode_text
+from write_behind import WRITE_INTERVAL_SECONDS, discard, flush_soon, mark_dirty, take
+
 st.set_page_config(page_title="Cribbage Tracker", layout="centered")
 
 # =====================================================
@@ -15,18 +17,30 @@ def load_game():
         key="load_game_once"
     )
     if data:
-        return json.loads(data)
+        return decode_text(data)
     return None
 
 
 def save_game(data):
-    streamlit_js_eval(
-        js_expressions=f"localStorage.setItem('cribbage_game', `{json.dumps(data)}`)",
-        key="save_game_once"
-    )
+    # Buffered; storage_writer writes st.session_state.game
+    mark_dirty("cribbage_game")
+
+
+@st.fragment(run_every=WRITE_INTERVAL_SECONDS)
+def storage_writer():
+    game = st.session_state.game
+    if not game:
+        return
+    data = take("cribbage_game", lambda: encode_text(game))
+    if data is not None:
+        streamlit_js_eval(
+            js_expressions=f"localStorage.setItem('cribbage_game', `{data}`)",
+            key="save_game_once"
+        )
 
 
 def clear_game():
+    discard("cribbage_game")
     streamlit_js_eval(
         js_expressions="localStorage.removeItem('cribbage_game')",
         key="clear_game_once"
@@ -120,6 +134,7 @@ def game_page():
 
     with col1:
         if st.button("How to Play", use_container_width=True):
+            flush_soon("cribbage_game")
             st.session_state.page = "rules"
             st.rerun()
 
@@ -208,4 +223,6 @@ if st.session_state.page == "rules":
 elif st.session_state.page == "landing":
     landing_page()
 else:
-    game_page()
\ No newline at end of file
+    game_page()
+
+storage_writer()
\ No newline at end of file
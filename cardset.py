@@ -0,0 +1,141 @@
+from scoring import card_name, card_value, parse_card
+
+# =====================================================
+# LOOKUP TABLES
+# =====================================================
+
+# Cards are suit * 13 + rank, so in a 52-bit mask each suit is one 13-bit
+# block. A block's rank bits spread to 3 bits per rank give that suit's
+# share of the rank histogram, packed the same way as the scorer's keys.
+SUIT_BITS = 0x1FFF
+
+_SPREAD = [0] * (1 << 13)
+for _bits in range(1, 1 << 13):
+    _low = _bits & -_bits
+    _SPREAD[_bits] = _SPREAD[_bits ^ _low] + (1 << (3 * (_low.bit_length() - 1)))
+
+# =====================================================
+# CARD SET
+# =====================================================
+
+class CardSet:
+    """An unordered set of cards as a 52-bit mask plus a rank histogram.
+
+    `mask` has bit `card` set for each card held. `ranks` packs the count
+    of each rank into 3 bits (rank r at bit 3r), the scorer's key format.
+    Membership, adding and removing a card and the lowest card held are
+    all integer operations; nothing allocates a list.
+    """
+
+    __slots__ = ("mask", "ranks")
+
+    def __init__(self, mask=0):
+        self.mask = mask
+        self.ranks = (
+            _SPREAD[mask & SUIT_BITS]
+            + _SPREAD[(mask >> 13) & SUIT_BITS]
+            + _SPREAD[(mask >> 26) & SUIT_BITS]
+            + _SPREAD[(mask >> 39) & SUIT_BITS]
+        )
+
+    @classmethod
+    def from_cards(cls, cards):
+        mask = 0
+        for card in cards:
+            mask |= 1 << card
+        return cls(mask)
+
+    @classmethod
+    def from_json(cls, value):
+        """Accept the stored form: a list of card names or a packed mask."""
+        if isinstance(value, int):
+            return cls(value)
+        return cls.from_cards(parse_card(name) for name in value or [])
+
+    def to_json(self):
+        return [card_name(card) for card in self]
+
+    def add(self, card):
+        if not self.mask >> card & 1:
+            self.mask |= 1 << card
+            self.ranks += 1 << (3 * (card % 13))
+
+    def discard(self, card):
+        if self.mask >> card & 1:
+            self.mask ^= 1 << card
+            self.ranks -= 1 << (3 * (card % 13))
+
+    def __contains__(self, card):
+        return self.mask >> card & 1 == 1
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __iter__(self):
+        mask = self.mask
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    def __eq__(self, other):
+        return isinstance(other, CardSet) and self.mask == other.mask
+
+    def __hash__(self):
+        return hash(self.mask)
+
+    def __repr__(self):
+        return f"CardSet({' '.join(self.to_json())})"
+
+    # -------------------------
+    # Ranks
+    # -------------------------
+
+    def rank_bits(self):
+        """13-bit mask of the ranks present in any suit."""
+        mask = self.mask
+        return (mask | mask >> 13 | mask >> 26 | mask >> 39) & SUIT_BITS
+
+    def min_value(self):
+        """Pip value of the lowest card held, or None when empty."""
+        bits = self.rank_bits()
+        return card_value((bits & -bits).bit_length() - 1) if bits else None
+
+# =====================================================
+# GAME STATE
+# =====================================================
+
+# Conversion between the JSON card fields of a game (see
+# main.new_game_state) and a compact form: hands and crib as masks and the
+# starter as an int. The cards survive the round trip but their order does
+# not: hands and crib come back sorted by card int. The pegging pile keeps
+# its card names, which codec.py already packs at a byte per card; piles
+# stored as card ints by earlier versions still expand.
+
+def compact_cards(game):
+    game = dict(game)
+    if "hands" in game:
+        game["hands"] = {
+            player: CardSet.from_json(hand).mask for player, hand in game["hands"].items()
+        }
+    if "crib" in game:
+        game["crib"] = CardSet.from_json(game["crib"]).mask
+    if game.get("starter_card") is not None:
+        game["starter_card"] = parse_card(game["starter_card"])
+    return game
+
+def expand_cards(game):
+    game = dict(game)
+    if "hands" in game:
+        game["hands"] = {
+            player: CardSet.from_json(hand).to_json() for player, hand in game["hands"].items()
+        }
+    if "crib" in game:
+        game["crib"] = CardSet.from_json(game["crib"]).to_json()
+    if isinstance(game.get("starter_card"), int):
+        game["starter_card"] = card_name(game["starter_card"])
+    if "pegging_pile" in game:
+        game["pegging_pile"] = [
+            card_name(card) if isinstance(card, int) else card for card in game["pegging_pile"]
+        ]
+    return game
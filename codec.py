@@ -0,0 +1,294 @@
+import base64
+import json
+import struct
+import zlib
+
+from scoring import DECK, card_name
+
+# =====================================================
+# FORMAT
+# =====================================================
+
+# A saved game is one version byte followed by that version's layout.
+# Version 0 is the plain JSON every app wrote before this codec; it always
+# starts with "{", so the first byte tells the two apart and old rows and
+# localStorage entries keep loading.
+#
+# Version 1 layout (little-endian):
+#   B version, B flags                  which of the fields below are present
+#   players        B count, then B length + UTF-8 per name
+#   scores         B count, then h per score
+#   dealer_index   B
+#   round          H
+#   pegging_count  B
+#   pegging_pile   B count, then B card per card name
+#   version        I
+#   history        I count, then one record per action (see below)
+#   I length + JSON of any other keys, so nothing is dropped
+#
+# Anything that doesn't fit (a 300-player game, a negative round) is
+# written as version 0 JSON instead.
+
+CODEC_VERSION = 1
+
+_FIELDS = ["players", "scores", "dealer_index", "round", "pegging_count", "pegging_pile", "version", "history"]
+_FLAG = {name: 1 << i for i, name in enumerate(_FIELDS)}
+
+_HEADER = struct.Struct("<BB")
+_BYTE = struct.Struct("<B")
+_SHORT = struct.Struct("<H")
+_INT = struct.Struct("<I")
+
+# History records, one kind byte first:
+#   0 score  B player, b points                 {"player", "points"}
+#   1 round                                     {"round": 1}
+#   2 card   B player, b points, B card         {"player", "points", "card"}
+#   3 pile   B player, b points, B n, n cards   {"player", "points", "pile"}
+#   4 undo                                      {"undo": true}
+#   255      I length, JSON                     anything else
+_SCORE = struct.Struct("<BBb")
+_CARD = struct.Struct("<BBbB")
+_PILE = struct.Struct("<BBbB")
+_OTHER = struct.Struct("<BI")
+
+_NAMES = [card_name(card) for card in DECK]
+_CARDS = {name: card for card, name in enumerate(_NAMES)}
+
+_SCORE_KEYS = {"player", "points"}
+_CARD_KEYS = {"player", "points", "card"}
+_PILE_KEYS = {"player", "points", "pile"}
+
+# =====================================================
+# ACTIONS
+# =====================================================
+
+def _pack_action(action, out):
+    keys = action.keys()
+    try:
+        if keys == _SCORE_KEYS:
+            out.append(_SCORE.pack(0, action["player"], action["points"]))
+            return
+        if keys == _CARD_KEYS:
+            out.append(_CARD.pack(2, action["player"], action["points"], _CARDS[action["card"]]))
+            return
+        if keys == _PILE_KEYS:
+            cards = bytes([_CARDS[name] for name in action["pile"]])
+            out.append(_PILE.pack(3, action["player"], action["points"], len(cards)))
+            out.append(cards)
+            return
+        if action == {"round": 1}:
+            out.append(b"\x01")
+            return
+        if action == {"undo": True}:
+            out.append(b"\x04")
+            return
+    except (struct.error, KeyError, TypeError, AttributeError):
+        pass
+
+    data = json.dumps(action, separators=(",", ":")).encode()
+    out.append(_OTHER.pack(255, len(data)))
+    out.append(data)
+
+def _unpack_action(data, offset):
+    kind = data[offset]
+    if kind == 0:
+        _, player, points = _SCORE.unpack_from(data, offset)
+        return {"player": player, "points": points}, offset + _SCORE.size
+    if kind == 1:
+        return {"round": 1}, offset + 1
+    if kind == 2:
+        _, player, points, card = _CARD.unpack_from(data, offset)
+        return {"player": player, "points": points, "card": _NAMES[card]}, offset + _CARD.size
+    if kind == 3:
+        _, player, points, n = _PILE.unpack_from(data, offset)
+        start = offset + _PILE.size
+        pile = [_NAMES[card] for card in data[start:start + n]]
+        return {"player": player, "points": points, "pile": pile}, start + n
+    if kind == 4:
+        return {"undo": True}, offset + 1
+    if kind == 255:
+        _, length = _OTHER.unpack_from(data, offset)
+        start = offset + _OTHER.size
+        return json.loads(data[start:start + length]), start + length
+    raise ValueError(f"unknown action record {kind}")
+
+def encode_action(action):
+    """One action as a history record, for the game_events log."""
+    out = []
+    _pack_action(action, out)
+    return b"".join(out)
+
+def decode_action(data):
+    """Inverse of encode_action; JSON text from before the codec also loads."""
+    if isinstance(data, str) or data[:1] == b"{":
+        return json.loads(data)
+    return _unpack_action(data, 0)[0]
+
+# =====================================================
+# GAMES
+# =====================================================
+
+def encode_game(game):
+    try:
+        return _encode_v1(game)
+    except (struct.error, KeyError, TypeError, AttributeError):
+        return json.dumps(game, separators=(",", ":")).encode()
+
+def _encode_v1(game):
+    flags = 0
+    out = [b""]
+
+    if "players" in game:
+        flags |= _FLAG["players"]
+        out.append(_BYTE.pack(len(game["players"])))
+        for name in game["players"]:
+            raw = name.encode()
+            out.append(_BYTE.pack(len(raw)))
+            out.append(raw)
+    if "scores" in game:
+        flags |= _FLAG["scores"]
+        scores = game["scores"]
+        out.append(struct.pack(f"<B{len(scores)}h", len(scores), *scores))
+    if "dealer_index" in game:
+        flags |= _FLAG["dealer_index"]
+        out.append(_BYTE.pack(game["dealer_index"]))
+    if "round" in game:
+        flags |= _FLAG["round"]
+        out.append(_SHORT.pack(game["round"]))
+    if "pegging_count" in game:
+        flags |= _FLAG["pegging_count"]
+        out.append(_BYTE.pack(game["pegging_count"]))
+    if "pegging_pile" in game:
+        # Card names only; piles of card ints go with the other keys
+        pile = game["pegging_pile"]
+        if all(isinstance(name, str) for name in pile):
+            flags |= _FLAG["pegging_pile"]
+            out.append(_BYTE.pack(len(pile)))
+            out.append(bytes([_CARDS[name] for name in pile]))
+    if "version" in game:
+        flags |= _FLAG["version"]
+        out.append(_INT.pack(game["version"]))
+    if "history" in game:
+        flags |= _FLAG["history"]
+        out.append(_INT.pack(len(game["history"])))
+        for action in game["history"]:
+            _pack_action(action, out)
+
+    packed = {name for name in _FIELDS if flags & _FLAG[name]}
+    extra = {k: v for k, v in game.items() if k not in packed}
+    data = json.dumps(extra, separators=(",", ":")).encode() if extra else b""
+    out.append(_INT.pack(len(data)))
+    out.append(data)
+
+    out[0] = _HEADER.pack(CODEC_VERSION, flags)
+    return b"".join(out)
+
+def decode_game(data):
+    """Load a game saved by encode_game, or as JSON before it existed."""
+    if isinstance(data, str):
+        data = data.encode()
+    if data[:1] == b"{":
+        version, game = 0, json.loads(data)
+    else:
+        version, game = data[0], _DECODERS[data[0]](data)
+
+    while version < CODEC_VERSION:
+        game = _MIGRATIONS[version](game)
+        version += 1
+    return game
+
+def _decode_v1(data):
+    _, flags = _HEADER.unpack_from(data, 0)
+    offset = _HEADER.size
+    game = {}
+
+    if flags & _FLAG["players"]:
+        n = data[offset]
+        offset += 1
+        players = []
+        for _ in range(n):
+            length = data[offset]
+            players.append(data[offset + 1:offset + 1 + length].decode())
+            offset += 1 + length
+        game["players"] = players
+    if flags & _FLAG["scores"]:
+        n = data[offset]
+        game["scores"] = list(struct.unpack_from(f"<{n}h", data, offset + 1))
+        offset += 1 + 2 * n
+    if flags & _FLAG["dealer_index"]:
+        game["dealer_index"] = data[offset]
+        offset += 1
+    if flags & _FLAG["round"]:
+        game["round"] = _SHORT.unpack_from(data, offset)[0]
+        offset += 2
+    if flags & _FLAG["pegging_count"]:
+        game["pegging_count"] = data[offset]
+        offset += 1
+    if flags & _FLAG["pegging_pile"]:
+        n = data[offset]
+        game["pegging_pile"] = [_NAMES[card] for card in data[offset + 1:offset + 1 + n]]
+        offset += 1 + n
+    if flags & _FLAG["version"]:
+        game["version"] = _INT.unpack_from(data, offset)[0]
+        offset += 4
+    if flags & _FLAG["history"]:
+        n = _INT.unpack_from(data, offset)[0]
+        offset += 4
+        history = []
+        for _ in range(n):
+            action, offset = _unpack_action(data, offset)
+            history.append(action)
+        game["history"] = history
+
+    length = _INT.unpack_from(data, offset)[0]
+    if length:
+        game.update(json.loads(data[offset + 4:offset + 4 + length]))
+    return game
+
+_DECODERS = {1: _decode_v1}
+
+# =====================================================
+# MIGRATIONS
+# =====================================================
+
+# _MIGRATIONS[v] turns a decoded version v game into version v + 1 shape.
+
+def _migrate_json(game):
+    """Strip the nested history out of old full-game snapshots."""
+    if "history" in game:
+        game["history"] = [
+            {k: entry[k] for k in ("scores", "dealer_index", "round")}
+            if "scores" in entry else entry
+            for entry in game["history"]
+        ]
+    return game
+
+_MIGRATIONS = {0: _migrate_json}
+
+# =====================================================
+# TEXT (LOCALSTORAGE)
+# =====================================================
+
+# localStorage only holds strings, so the bytes go through base64. Its
+# alphabet also needs no escaping inside a JS string literal. Payloads of
+# COMPRESS_MIN_BYTES or more are deflated first and marked with a leading
+# "~"; small ones skip zlib, where it would save next to nothing.
+
+COMPRESS_MIN_BYTES = 256
+
+def encode_text(game):
+    data = encode_game(game)
+    if len(data) >= COMPRESS_MIN_BYTES:
+        packed = zlib.compress(data)
+        if len(packed) < len(data):
+            return "~" + base64.b64encode(packed).decode("ascii")
+    if data[:1] == b"{":
+        return data.decode()
+    return base64.b64encode(data).decode("ascii")
+
+def decode_text(text):
+    if text.startswith("{"):
+        return decode_game(text)
+    if text.startswith("~"):
+        return decode_game(zlib.decompress(base64.b64decode(text[1:])))
+    return decode_game(base64.b64decode(text))
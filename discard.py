@@ -0,0 +1,161 @@
+from itertools import combinations, combinations_with_replacement
+
+import numpy as np
+
+from score_table import HAND_RANKS, MAGIC, hand_rank_index, load_table
+from scoring import DECK, JACK
+
+# =====================================================
+# SCORE TABLE VIEWS
+# =====================================================
+
+# The 15 ways to throw two of six cards, as positions in the dealt hand
+THROWS = list(combinations(range(6), 2))
+
+_scores = None
+_hand_index = None
+_crib_values = None
+
+def hand_scores():
+    """The memory-mapped hand score table as a uint8 array (no copy)."""
+    global _scores
+    if _scores is None:
+        _scores = np.frombuffer(load_table(), dtype=np.uint8, offset=len(MAGIC))
+    return _scores
+
+def hand_index():
+    """Sorted four ranks in base 13 -> position in HAND_RANKS, as an array."""
+    global _hand_index
+    if _hand_index is None:
+        index = np.zeros(13 ** 4, dtype=np.int64)
+        for i, (a, b, c, d) in enumerate(HAND_RANKS):
+            index[((a * 13 + b) * 13 + c) * 13 + d] = i
+        _hand_index = index
+    return _hand_index
+
+def crib_values():
+    """Expected crib points by the ranks of the two cards thrown into it.
+
+    Averages over every rank the other two crib cards and the starter can
+    take, weighted by how many cards of each rank are left. Suits are
+    ignored apart from nobs, which is counted as a 1 in 4 chance per jack;
+    crib flushes are rare enough to leave out.
+    """
+    global _crib_values
+    if _crib_values is None:
+        scores = hand_scores()
+        ranks_index = hand_index()
+
+        others = np.array(list(combinations_with_replacement(range(13), 2)))
+        x, y = others[:, 0], others[:, 1]
+        starter = np.arange(13)
+        eye = np.eye(13, dtype=np.int64)
+
+        values = np.zeros((13, 13))
+        for r1, r2 in combinations_with_replacement(range(13), 2):
+            left = 4 - eye[r1] - eye[r2]
+            pair_weight = np.where(x == y, left[x] * (left[x] - 1) // 2, left[x] * left[y])
+            starter_weight = left[None, :] - eye[x] - eye[y]
+            weight = pair_weight[:, None] * np.clip(starter_weight, 0, None)
+
+            crib = np.sort(np.column_stack([np.full_like(x, r1), np.full_like(x, r2), x, y]), axis=1)
+            code = ((crib[:, 0] * 13 + crib[:, 1]) * 13 + crib[:, 2]) * 13 + crib[:, 3]
+            # No flush, no nobs: index ((ranks * 13 + starter) * 3 + 0) * 2 + 0
+            points = scores[(ranks_index[code][:, None] * 13 + starter[None, :]) * 6]
+
+            jacks = (crib == JACK).sum(axis=1)
+            expected = (weight * (points + 0.25 * jacks[:, None])).sum() / weight.sum()
+            values[r1, r2] = values[r2, r1] = expected
+
+        _crib_values = values
+    return _crib_values
+
+# =====================================================
+# BATCH SCORING
+# =====================================================
+
+BATCH_CHUNK = 1 << 16
+
+def score_hands_batch(cards, crib=False):
+    """Score an (N, 5) int array of cards; returns an (N,) array of points.
+
+    Columns 0-3 hold the hand (or crib) and column 4 the starter card. Each
+    row becomes a score table index, as in best_discards, so the whole batch
+    is one gather. Large batches go in chunks to keep memory flat.
+    """
+    cards = np.asarray(cards, dtype=np.int64)
+    scores = np.empty(len(cards), dtype=np.int32)
+    for start in range(0, len(cards), BATCH_CHUNK):
+        chunk = cards[start:start + BATCH_CHUNK]
+        scores[start:start + len(chunk)] = hand_scores()[_batch_index(chunk, crib)]
+    return scores
+
+def _batch_index(cards, crib):
+    hand, starter = cards[:, :4], cards[:, 4]
+    starter_suit = starter // 13
+
+    ranks = np.sort(hand % 13, axis=1)
+    code = ((ranks[:, 0] * 13 + ranks[:, 1]) * 13 + ranks[:, 2]) * 13 + ranks[:, 3]
+
+    suits = hand // 13
+    suited = (suits[:, 1:] == suits[:, :1]).all(axis=1)
+    flush = np.where(suited & (suits[:, 0] == starter_suit), 2, np.where(suited & (not crib), 1, 0))
+
+    nobs = ((hand % 13 == JACK) & (suits == starter_suit[:, None])).any(axis=1)
+
+    return ((hand_index()[code] * 13 + starter % 13) * 3 + flush) * 2 + nobs
+
+# =====================================================
+# DISCARD ADVISOR
+# =====================================================
+
+def best_discards(cards, dealer):
+    """Rank the 15 ways to throw two of six dealt cards, best first.
+
+    Each option is a dict with the cards to keep and throw, the average
+    show of the kept hand over all 46 possible starters, the expected crib
+    points of the throw, and the total: crib points count for the dealer
+    and against everyone else.
+    """
+    if len(cards) != 6:
+        raise ValueError("best_discards needs the 6 dealt cards")
+
+    keeps = [[c for j, c in enumerate(cards) if j not in throw] for throw in THROWS]
+    throws = [[cards[i], cards[j]] for i, j in THROWS]
+
+    starters = np.array([card for card in DECK if card not in cards])
+    starter_rank = starters % 13
+    starter_suit = starters // 13
+
+    ranks = np.array([hand_rank_index(keep) for keep in keeps])
+
+    # Flush kind against each starter: 2 for five cards, 1 for four
+    suited = np.array([len({c // 13 for c in keep}) == 1 for keep in keeps])
+    keep_suit = np.array([keep[0] // 13 for keep in keeps])
+    flush = np.where(suited[:, None], np.where(keep_suit[:, None] == starter_suit, 2, 1), 0)
+
+    # Nobs when the starter's suit matches a kept jack
+    jack_suits = np.zeros((15, 4), dtype=np.int64)
+    for k, keep in enumerate(keeps):
+        for c in keep:
+            if c % 13 == JACK:
+                jack_suits[k, c // 13] = 1
+    nobs = jack_suits[:, starter_suit]
+
+    index = ((ranks[:, None] * 13 + starter_rank) * 3 + flush) * 2 + nobs
+    hand = hand_scores()[index].mean(axis=1)
+
+    throw_ranks = np.array([[a % 13, b % 13] for a, b in throws])
+    crib = crib_values()[throw_ranks[:, 0], throw_ranks[:, 1]]
+    total = hand + crib if dealer else hand - crib
+
+    return [
+        {
+            "keep": keeps[k],
+            "throw": throws[k],
+            "hand": float(hand[k]),
+            "crib": float(crib[k]),
+            "total": float(total[k]),
+        }
+        for k in np.argsort(-total, kind="stable")
+    ]
@@ -6,45 +6,86 @@ import json
 
 from validators import length
 
-# =====================================================
-# JS READY — one-time rerun so JS components mount
-# =====================================================
-if "js_ready" not in st.session_state:
-    st.session_state.js_ready = True
-    st.rerun()
-
+from cardset import compact_cards, expand_cards
+from codec import decode_text, encode_text
+from write_behind import WRITE_INTERVAL_SECONDS, discard, mark_dirty, take
 
 # =====================================================
 # LOCAL STORAGE WRAPPER
 # =====================================================
 
-def ls_write(key: str, value):
-    """Write Python object to browser localStorage safely"""
-    json_value = json.dumps(value)
+# A value longer than LS_CHUNK_CHARS is split over "<key>.<gen>.<i>" items,
+# and the key itself holds a manifest: "#" + {"gen": g, "chunks": n}. New
+# chunks go under the generation the current manifest isn't using, and the
+# manifest is swapped in last, so a write that fails part way (e.g. over
+# quota) leaves the previous value readable. Values reach the JS as JSON
+# string literals, so no character can break out of them.
+
+LS_CHUNK_CHARS = 64 * 1024
+
+_LS_MANIFEST_JS = """
+    const manifest = (v) => v && v.startsWith("#") ? JSON.parse(v.slice(1)) : null;
+    const dropChunks = (key, m) => {
+        for (let i = 0; m && i < m.chunks; i++) localStorage.removeItem(`${key}.${m.gen}.${i}`);
+    };
+"""
+
+
+def ls_get_js(key: str):
+    """JS expression for the value stored under key, chunks reassembled"""
+    return f"""(() => {{{_LS_MANIFEST_JS}
+    const key = {json.dumps(key)};
+    const value = localStorage.getItem(key);
+    const m = manifest(value);
+    if (!m) return value;
+    const parts = [];
+    for (let i = 0; i < m.chunks; i++) {{
+        const part = localStorage.getItem(`${{key}}.${{m.gen}}.${{i}}`);
+        if (part === null) return null;
+        parts.push(part);
+    }}
+    return parts.join("");
+}})()"""
+
+
+def ls_write(key: str, text_value: str):
+    """Write text from codec.encode_text to browser localStorage"""
+    chunks = [
+        text_value[i:i + LS_CHUNK_CHARS]
+        for i in range(0, len(text_value), LS_CHUNK_CHARS)
+    ] or [""]
     streamlit_js_eval(
-        js_expressions=f'localStorage.setItem("{key}", `{json_value}`);',
+        js_expressions=f"""(() => {{{_LS_MANIFEST_JS}
+    const key = {json.dumps(key)};
+    const chunks = {json.dumps(chunks)};
+    const old = manifest(localStorage.getItem(key));
+    if (chunks.length === 1) {{
+        localStorage.setItem(key, chunks[0]);
+        dropChunks(key, old);
+        return;
+    }}
+    const next = {{gen: old && old.gen === 0 ? 1 : 0, chunks: chunks.length}};
+    try {{
+        chunks.forEach((part, i) => localStorage.setItem(`${{key}}.${{next.gen}}.${{i}}`, part));
+        localStorage.setItem(key, "#" + JSON.stringify(next));
+    }} catch (e) {{
+        dropChunks(key, next);
+        throw e;
+    }}
+    dropChunks(key, old);
+}})()""",
         key=f"ls_save_{key}"
     )
 
 
 
-def ls_read(key: str):
-    val = streamlit_js_eval(
-        js_expressions=f"localStorage.getItem('{key}')",
-        key=f"ls_load_{key}"
-    )
-    if val is None:
-        return None
-    try:
-        return json.loads(val)
-    except:
-        return None
-
-
-
 def ls_delete(key: str):
     streamlit_js_eval(
-        js_expressions=f"localStorage.removeItem('{key}')",
+        js_expressions=f"""(() => {{{_LS_MANIFEST_JS}
+    const key = {json.dumps(key)};
+    dropChunks(key, manifest(localStorage.getItem(key)));
+    localStorage.removeItem(key);
+}})()""",
         key=f"ls_del_{key}"
     )
 
@@ -77,16 +118,30 @@ GAME_KEY = "cribbage_game_state"
 
 
 def load_game():
-    state = ls_read(GAME_KEY)
-    if state:
-        st.session_state.game = state
-    else:
+    """Decode the stored text cached by hydrate()."""
+    text = st.session_state.stored_game_text
+    try:
+        st.session_state.game = expand_cards(decode_text(text)) if text else None
+    except:
         st.session_state.game = None
 
 
 def save_game():
+    # Buffered; storage_writer does the actual write
     if "game" in st.session_state and st.session_state.game:
-        ls_write(GAME_KEY, st.session_state.game)
+        mark_dirty(GAME_KEY)
+
+
+@st.fragment(run_every=WRITE_INTERVAL_SECONDS)
+def storage_writer():
+    game = st.session_state.get("game")
+    if not game:
+        return
+    # Hands and crib are stored as card masks (see cardset.py)
+    text_value = take(GAME_KEY, lambda: encode_text(compact_cards(game)))
+    if text_value is not None:
+        ls_write(GAME_KEY, text_value)
+        st.session_state.stored_game_text = text_value
 
 
 def update_game(updates: dict):
@@ -98,30 +153,31 @@ def update_game(updates: dict):
 # INITIAL LOAD (once)
 # =====================================================
 
-if "game_load_phase" not in st.session_state:
-    st.session_state.game_load_phase = 0
+# One component call reads the stored game. It returns None until the
+# component has mounted and then a JSON envelope, which is set even when
+# nothing is stored, so "not loaded yet" and "no game" can't be confused.
+# The stored text is cached for the session and kept current by
+# storage_writer, so nothing reads localStorage again.
+
+def hydrate():
+    if "stored_game_text" in st.session_state:
+        return True
 
-if st.session_state.game_load_phase == 0:
-    # trigger JS read
-    st.session_state._raw_game_json = streamlit_js_eval(
-        js_expressions=f"localStorage.getItem('{GAME_KEY}')",
+    envelope = streamlit_js_eval(
+        js_expressions=f"JSON.stringify({{ready: true, value: {ls_get_js(GAME_KEY)}}})",
         key="init_ls_read"
     )
-    st.session_state.game_load_phase = 1
-    st.rerun()
-
-elif st.session_state.game_load_phase == 1:
-    raw = st.session_state._raw_game_json
-
-    if raw:
-        try:
-            st.session_state.game = json.loads(raw)
-        except:
-            st.session_state.game = None
-    else:
-        st.session_state.game = None
+    if envelope is None:
+        return False
 
-    st.session_state.game_load_phase = 2
+    st.session_state.stored_game_text = json.loads(envelope)["value"]
+    load_game()
+    return True
+
+
+# The component's value arriving triggers the next run
+if not hydrate():
+    st.stop()
 
 
 # =====================================================
@@ -230,6 +286,8 @@ else:
     # -------------------------
     if st.button("Reset Game"):
         ls_delete(GAME_KEY)
+        discard(GAME_KEY)
+        st.session_state.stored_game_text = None
         st.session_state.game = None
         st.rerun()
 
@@ -239,4 +297,15 @@ else:
 # =====================================================
 
 with st.expander("Debug — Raw Stored JSON"):
-    st.json(ls_read(GAME_KEY))
+    stored = st.session_state.stored_game_text
+    try:
+        st.json(decode_text(stored) if stored else None)
+    except:
+        st.code(stored)
+
+
+# =====================================================
+# STORAGE WRITES
+# =====================================================
+
+storage_writer()
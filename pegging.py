@@ -0,0 +1,85 @@
+from scoring import card_value, parse_card
+
+# =====================================================
+# PEGGING PILE
+# =====================================================
+
+class PeggingPile:
+    """The cards played since the count last reset, scored as they land.
+
+    Every play is a constant-size update: pairs come from the length of the
+    tail of equal ranks, and runs from an XOR of rank bits over the tail of
+    distinct ranks, which can never be longer than 13 cards. Nothing is
+    sorted and the pile is never rescanned. `undo` takes back the last play
+    just as cheaply, so a player can try each card before choosing one.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Start a new count, after a go or 31."""
+        self.cards = []
+        self.count = 0
+        self._same = 0
+        self._window = 0
+        self._last_seen = [-1] * 13
+        self._rank_bits = [0]
+        self._undo = []
+
+    @classmethod
+    def from_state(cls, pegging_pile):
+        """Rebuild from the card names stored in a game's pegging_pile."""
+        pile = cls()
+        for name in pegging_pile:
+            pile.play(parse_card(name))
+        return pile
+
+    def can_play(self, card):
+        return self.count + card_value(card) <= 31
+
+    def play(self, card):
+        """Lay a card on the pile and return the points it scores."""
+        value = card_value(card)
+        if self.count + value > 31:
+            raise ValueError("card would take the count past 31")
+
+        rank = card % 13
+        n = len(self.cards)
+        self._undo.append((self._same, self._window, self._last_seen[rank]))
+
+        if n and self.cards[-1] % 13 == rank:
+            self._same += 1
+        else:
+            self._same = 1
+
+        # Tail of distinct ranks; a repeated rank cuts it after its last copy
+        self._window = max(self._window, self._last_seen[rank] + 1)
+        self._last_seen[rank] = n
+
+        self.cards.append(card)
+        self.count += value
+        self._rank_bits.append(self._rank_bits[-1] ^ (1 << rank))
+
+        points = 2 if self.count in (15, 31) else 0
+        points += self._same * (self._same - 1)
+        points += self._run_length()
+        return points
+
+    def undo(self):
+        """Take back the last card played."""
+        card = self.cards.pop()
+        self.count -= card_value(card)
+        self._rank_bits.pop()
+        self._same, self._window, self._last_seen[card % 13] = self._undo.pop()
+
+    def _run_length(self):
+        n = len(self.cards)
+        bits = self._rank_bits
+        for length in range(n - self._window, 2, -1):
+            # Ranks in the tail are distinct, so XOR of prefixes is their set
+            ranks = bits[n] ^ bits[n - length]
+            low = ranks & -ranks
+            if ranks // low == (1 << length) - 1:
+                return length
+        return 0
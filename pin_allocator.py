@@ -0,0 +1,101 @@
+import random
+import threading
+
+# =====================================================
+# PIN ALLOCATOR
+# =====================================================
+
+class PinAllocator:
+    """Hands out random free PINs of `width` digits in O(1).
+
+    The free PINs are the first `_free` slots of a virtual array over the
+    whole PIN space, shuffled lazily: a slot holds its own number unless
+    `_slots` says otherwise, and `_where` tracks PINs that have moved. Taking
+    a PIN swaps the last free slot into its place, so only PINs that have
+    been moved or taken cost memory, and an 8-digit space is as cheap to set
+    up as a 4-digit one.
+    """
+
+    def __init__(self, width=4, used=()):
+        self.width = width
+        self._lock = threading.Lock()
+        self._rng = random.SystemRandom()
+        self.sync(used)
+
+    def format(self, number):
+        return f"{number:0{self.width}d}"
+
+    def _parse(self, pin):
+        if len(pin) != self.width or not pin.isdigit():
+            return None
+        return int(pin)
+
+    def _slot(self, i):
+        return self._slots.get(i, i)
+
+    def _index(self, number):
+        return self._where.get(number, number)
+
+    def _is_free(self, number):
+        i = self._index(number)
+        return i < self._free and self._slot(i) == number
+
+    def _take(self, number):
+        i = self._index(number)
+        last = self._free - 1
+        moved = self._slot(last)
+
+        self._slots[i] = moved
+        self._where[moved] = i
+        self._free = last
+
+        # Drop entries that are back to their identity or now unused
+        self._slots.pop(last, None)
+        self._where.pop(number, None)
+        if self._slots.get(i) == i:
+            del self._slots[i]
+        if self._where.get(moved) == moved:
+            del self._where[moved]
+
+    def allocate(self):
+        """A random free PIN, now taken; None when every PIN is in use."""
+        with self._lock:
+            if not self._free:
+                return None
+            number = self._slot(self._rng.randrange(self._free))
+            self._take(number)
+            return self.format(number)
+
+    def release(self, pin):
+        """Return a PIN to the pool once its game is gone."""
+        number = self._parse(pin)
+        with self._lock:
+            if number is None or self._is_free(number):
+                return
+            i = self._free
+            if number != i:
+                self._slots[i] = number
+                self._where[number] = i
+            else:
+                self._slots.pop(i, None)
+                self._where.pop(number, None)
+            self._free += 1
+
+    def sync(self, used):
+        """Start over with every PIN free except `used`.
+
+        The database is the source of truth: other processes create and end
+        games too, so the pool is rebuilt from the PINs actually stored.
+        """
+        with self._lock:
+            self._free = 10 ** self.width
+            self._slots = {}
+            self._where = {}
+            for pin in used:
+                number = self._parse(pin)
+                if number is not None and self._is_free(number):
+                    self._take(number)
+
+    def __len__(self):
+        """Number of free PINs."""
+        return self._free
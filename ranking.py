@@ -0,0 +1,80 @@
+import threading
+from bisect import bisect_left, insort
+
+# =====================================================
+# RANKING
+# =====================================================
+
+class Ranking:
+    """The leaderboard held sorted in memory, for ranks and pages.
+
+    `_keys` is sorted by (-points, player), so a player's rank is one more
+    than the number of keys before the first with their points: a bisect.
+    refresh() applies only the rows changed since the generation it last
+    saw, so finishing a game costs a few inserts rather than a re-sort,
+    and games banked by other processes are picked up the same way.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._points = {}
+        self.generation = None
+        self._lock = threading.Lock()
+
+    def refresh(self, conn):
+        c = conn.cursor()
+        c.execute("BEGIN")
+        generation = c.execute("SELECT generation FROM leaderboard_meta").fetchone()[0]
+        with self._lock:
+            if generation == self.generation:
+                return
+            if self.generation is None:
+                c.execute("SELECT player, total_points FROM leaderboard ORDER BY total_points DESC, player")
+                self._keys = [(-points, player) for player, points in c.fetchall()]
+                self._points = {player: -points for points, player in self._keys}
+            else:
+                c.execute(
+                    "SELECT player, total_points FROM leaderboard WHERE generation > ?",
+                    (self.generation,)
+                )
+                for player, points in c.fetchall():
+                    self._set(player, points)
+            self.generation = generation
+
+    def _set(self, player, points):
+        old = self._points.get(player)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, player))]
+        insort(self._keys, (-points, player))
+        self._points[player] = points
+
+    def _rank_of(self, points):
+        return bisect_left(self._keys, (-points,)) + 1
+
+    def __len__(self):
+        return len(self._keys)
+
+    def rank(self, player):
+        """(rank, points) for `player`, or None; tied players share a rank."""
+        with self._lock:
+            points = self._points.get(player)
+            if points is None:
+                return None
+            return self._rank_of(points), points
+
+    def index(self, player):
+        """`player`'s position in the sorted order, or None; unlike the rank
+        it is unique, so it tells which page a tied player is on."""
+        with self._lock:
+            points = self._points.get(player)
+            if points is None:
+                return None
+            return bisect_left(self._keys, (-points, player))
+
+    def page(self, offset, limit):
+        """[(rank, player, points)] for positions offset to offset + limit."""
+        with self._lock:
+            return [
+                (self._rank_of(-key), player, -key)
+                for key, player in self._keys[offset:offset + limit]
+            ]
@@ -0,0 +1,104 @@
+import mmap
+import os
+from itertools import combinations_with_replacement
+
+from scoring import JACK, rank_points
+
+# =====================================================
+# TABLE LAYOUT
+# =====================================================
+
+# Every hand score, one byte each, indexed by
+#   (hand ranks, starter rank, flush kind, nobs)
+# The four hand ranks are a multiset (order and suits don't matter), so
+# there are only 1820 of them. Flush kind is 0 none, 1 four-card hand
+# flush, 2 five-card flush. Build with `python score_table.py`; the app
+# builds it on first use if the file is missing.
+
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "hand_scores.bin")
+
+MAGIC = b"CRIBTBL1"
+
+HAND_RANKS = list(combinations_with_replacement(range(13), 4))
+
+# Rank histogram key of the four hand cards -> position in HAND_RANKS
+_HAND_INDEX = {
+    sum(1 << (3 * r) for r in ranks): i for i, ranks in enumerate(HAND_RANKS)
+}
+_RANK_WEIGHT = [1 << (3 * (card % 13)) for card in range(52)]
+
+TABLE_SIZE = len(HAND_RANKS) * 13 * 3 * 2
+
+FLUSH_POINTS = [0, 4, 5]
+
+# =====================================================
+# BUILD
+# =====================================================
+
+def build_table(path=TABLE_FILE):
+    table = bytearray(TABLE_SIZE)
+    i = 0
+    for ranks in HAND_RANKS:
+        for starter in range(13):
+            base = rank_points(ranks + (starter,))
+            for flush in FLUSH_POINTS:
+                table[i] = base + flush
+                table[i + 1] = base + flush + 1
+                i += 2
+
+    # Write under a temporary name so readers never map a partial file
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(table)
+    os.replace(tmp, path)
+
+# =====================================================
+# LOOKUP
+# =====================================================
+
+_table = None
+
+def load_table(path=TABLE_FILE):
+    """Map the table read-only; every process shares it via the page cache."""
+    global _table
+    if _table is None:
+        if not os.path.exists(path) or os.path.getsize(path) != len(MAGIC) + TABLE_SIZE:
+            build_table(path)
+        with open(path, "rb") as f:
+            table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if table[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a hand score table")
+        _table = table
+    return _table
+
+def hand_rank_index(hand):
+    """Position of the hand's four ranks in HAND_RANKS."""
+    a, b, c, d = hand
+    weight = _RANK_WEIGHT
+    return _HAND_INDEX[weight[a] + weight[b] + weight[c] + weight[d]]
+
+def table_index(hand, starter, crib=False):
+    a, b, c, d = hand
+    ranks = hand_rank_index(hand)
+
+    flush = 0
+    hand_suit = a // 13
+    if hand_suit == b // 13 == c // 13 == d // 13:
+        if hand_suit == starter // 13:
+            flush = 2
+        elif not crib:
+            flush = 1
+
+    jack = (starter // 13) * 13 + JACK
+    nobs = 1 if jack in hand else 0
+
+    return ((ranks * 13 + starter % 13) * 3 + flush) * 2 + nobs
+
+def lookup_score(hand, starter, crib=False):
+    """Score a 4-card hand (or crib) with one read from the table."""
+    return load_table()[len(MAGIC) + table_index(hand, starter, crib)]
+
+if __name__ == "__main__":
+    build_table()
+    print(f"Wrote {TABLE_SIZE} hand scores to {TABLE_FILE}")
@@ -0,0 +1,159 @@
+# =====================================================
+# CARDS
+# =====================================================
+
+# A card is a small int: card = suit * 13 + rank, with rank 0 (Ace) to
+# 12 (King) and suit 0-3. Game state stores cards by name, e.g. "10♥".
+
+RANKS = ["A", "2", "3", "4", "5", "6", "7", "8", "9", "10", "J", "Q", "K"]
+SUITS = ["♠", "♥", "♦", "♣"]
+
+JACK = 10
+
+DECK = list(range(52))
+
+# Points to win a game
+WINNING_SCORE = 121
+
+def card_rank(card):
+    return card % 13
+
+def card_suit(card):
+    return card // 13
+
+def card_value(card):
+    return min(card % 13 + 1, 10)
+
+def card_name(card):
+    return RANKS[card % 13] + SUITS[card // 13]
+
+def parse_card(name):
+    return SUITS.index(name[-1]) * 13 + RANKS.index(name[:-1])
+
+# =====================================================
+# LOOKUP TABLES
+# =====================================================
+
+_VALUES = [min(r + 1, 10) for r in range(13)]
+_SUIT = [card // 13 for card in DECK]
+
+# Rank histogram key: each card adds 1 to a 3-bit counter for its rank, so
+# the key of a hand does not depend on the order of its cards.
+_RANK_WEIGHT = [1 << (3 * (card % 13)) for card in DECK]
+
+# Jack of the same suit as the starter, for nobs
+_NOBS_JACK = [(card // 13) * 13 + JACK for card in DECK]
+
+# The 31 non-empty subsets of five cards as (mask, mask without its lowest
+# card, index of that card). In this order each subset's sum is built from
+# a sum that is already known, one addition per subset.
+_SUBSET_STEPS = [
+    (mask, mask & (mask - 1), (mask & -mask).bit_length() - 1)
+    for mask in range(1, 32)
+]
+
+# Fifteens + pairs + runs by rank histogram key, filled in as keys are seen
+_RANK_POINTS = {}
+
+def _rank_points(key):
+    """Points from fifteens, pairs and runs, which ignore suits."""
+    counts = [(key >> (3 * r)) & 7 for r in range(13)]
+    values = [_VALUES[r] for r in range(13) for _ in range(counts[r])]
+
+    sums = [0] * 32
+    fifteens = 0
+    for mask, rest, i in _SUBSET_STEPS:
+        total = sums[rest] + values[i]
+        sums[mask] = total
+        if total == 15:
+            fifteens += 1
+
+    # n cards of one rank make n * (n - 1) / 2 pairs worth 2 points each
+    pairs = sum(n * (n - 1) for n in counts)
+
+    # Five cards hold at most one run of three or more
+    runs = 0
+    length = 0
+    combos = 1
+    for n in counts + [0]:
+        if n:
+            length += 1
+            combos *= n
+        else:
+            if length >= 3:
+                runs = length * combos
+            length = 0
+            combos = 1
+
+    points = 2 * fifteens + pairs + runs
+    _RANK_POINTS[key] = points
+    return points
+
+def rank_points(ranks):
+    """Fifteens, pairs and runs for the ranks of five cards."""
+    key = sum(1 << (3 * r) for r in ranks)
+    points = _RANK_POINTS.get(key)
+    return _rank_points(key) if points is None else points
+
+# =====================================================
+# HAND SCORING
+# =====================================================
+
+def score_hand(hand, starter, crib=False):
+    """Score a 4-card hand (or crib) with its starter card."""
+    return score_hands([hand], [starter], crib)[0]
+
+def score_hands(hands, starters, crib=False):
+    """Score many hands at once; returns a list of points."""
+    weight = _RANK_WEIGHT
+    suit = _SUIT
+    nobs_jack = _NOBS_JACK
+    rank_points = _RANK_POINTS
+    scores = []
+    append = scores.append
+
+    for (a, b, c, d), s in zip(hands, starters):
+        key = weight[a] + weight[b] + weight[c] + weight[d] + weight[s]
+        points = rank_points.get(key)
+        if points is None:
+            points = _rank_points(key)
+
+        hand_suit = suit[a]
+        if hand_suit == suit[b] == suit[c] == suit[d]:
+            if hand_suit == suit[s]:
+                points += 5
+            elif not crib:
+                points += 4
+
+        jack = nobs_jack[s]
+        if jack == a or jack == b or jack == c or jack == d:
+            points += 1
+
+        append(points)
+
+    return scores
+
+def score_cardset(hand, starter, crib=False):
+    """Score a cardset.CardSet of four cards with its starter card.
+
+    The set already carries its rank histogram key and suit bits, so no
+    card list is built.
+    """
+    mask = hand.mask
+    key = hand.ranks + _RANK_WEIGHT[starter]
+    points = _RANK_POINTS.get(key)
+    if points is None:
+        points = _rank_points(key)
+
+    # All four cards share the suit of the highest one
+    hand_suit = (mask.bit_length() - 1) // 13
+    if not mask & ((1 << (13 * hand_suit)) - 1):
+        if hand_suit == _SUIT[starter]:
+            points += 5
+        elif not crib:
+            points += 4
+
+    if mask >> _NOBS_JACK[starter] & 1:
+        points += 1
+
+    return points
@@ -0,0 +1,201 @@
+import argparse
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from discard import best_discards
+from cardset import CardSet
+from pegging import PeggingPile
+from scoring import DECK, JACK, WINNING_SCORE, card_value, score_cardset
+from win_probability import STATS_FILE
+
+# =====================================================
+# SIMULATION SETTINGS
+# =====================================================
+
+# Two-player games to 121. Both players throw with the discard advisor and
+# peg greedily. The dealer passes to the other player every hand, like the
+# New Round button in version4. Tallies are written to
+# win_probability.STATS_FILE.
+
+SHARD_GAMES = 2000
+
+_VALUE = [card_value(card) for card in DECK]
+
+# =====================================================
+# PEGGING
+# =====================================================
+
+def peg(hands, dealer):
+    """Play out the pegging; returns (player, points) in the order scored."""
+    hands = [CardSet.from_cards(hand) for hand in hands]
+    value = _VALUE
+    pile = PeggingPile()
+    scored = []
+
+    def can_play(player):
+        lowest = hands[player].min_value()
+        return lowest is not None and pile.count + lowest <= 31
+
+    def try_card(card):
+        points = pile.play(card)
+        pile.undo()
+        return points
+
+    turn = 1 - dealer
+    last = turn
+
+    while hands[0] or hands[1]:
+        if can_play(turn):
+            # Greedy: take the most points now, then the highest card
+            card = max(
+                (c for c in hands[turn] if pile.count + value[c] <= 31),
+                key=lambda c: (try_card(c), value[c])
+            )
+            hands[turn].discard(card)
+            points = pile.play(card)
+            last = turn
+
+            if points:
+                scored.append((turn, points))
+
+            if pile.count == 31:
+                pile.reset()
+                turn = 1 - last
+            elif can_play(1 - turn):
+                turn = 1 - turn
+        elif can_play(1 - turn):
+            turn = 1 - turn
+        else:
+            # Nobody can play: go for the last player to lay a card
+            scored.append((last, 1))
+            pile.reset()
+            turn = 1 - last
+
+    if pile.cards:
+        scored.append((last, 1))
+
+    return scored
+
+# =====================================================
+# GAME
+# =====================================================
+
+def play_game(rng, visits, wins):
+    """Play one game, adding its hand-start states to the tallies.
+
+    visits and wins are indexed [my score, opponent score, I deal].
+    """
+    scores = [0, 0]
+    dealer = rng.randint(0, 1)
+    seen = []
+
+    def add(player, points):
+        scores[player] += points
+        return scores[player] >= WINNING_SCORE
+
+    while True:
+        seen.append((scores[0], scores[1], dealer))
+
+        cards = rng.sample(DECK, 13)
+        starter = cards[12]
+        keeps = []
+        crib = CardSet()
+        for player, dealt in enumerate((cards[0:6], cards[6:12])):
+            best = best_discards(dealt, player == dealer)[0]
+            keeps.append(best["keep"])
+            for card in best["throw"]:
+                crib.add(card)
+
+        winner = None
+        pone = 1 - dealer
+
+        if starter % 13 == JACK and add(dealer, 2):
+            winner = dealer
+
+        if winner is None:
+            for player, points in peg(keeps, dealer):
+                if add(player, points):
+                    winner = player
+                    break
+
+        if winner is None:
+            for player, hand, is_crib in (
+                (pone, CardSet.from_cards(keeps[pone]), False),
+                (dealer, CardSet.from_cards(keeps[dealer]), False),
+                (dealer, crib, True),
+            ):
+                if add(player, score_cardset(hand, starter, is_crib)):
+                    winner = player
+                    break
+
+        if winner is not None:
+            break
+
+        dealer = 1 - dealer
+
+    for s0, s1, deals in seen:
+        visits[s0, s1, int(deals == 0)] += 1
+        visits[s1, s0, int(deals == 1)] += 1
+        wins[s0, s1, int(deals == 0)] += winner == 0
+        wins[s1, s0, int(deals == 1)] += winner == 1
+
+    return winner
+
+def run_shard(games, seed):
+    """Worker entry point: play `games` games with their own seeded RNG."""
+    rng = random.Random(seed)
+    visits = np.zeros((WINNING_SCORE, WINNING_SCORE, 2), dtype=np.int64)
+    wins = np.zeros_like(visits)
+    for _ in range(games):
+        play_game(rng, visits, wins)
+    return games, visits, wins
+
+# =====================================================
+# PARALLEL RUNS
+# =====================================================
+
+def simulate(games, workers=None, seed=None, progress=None):
+    """Play `games` games across a process pool and merge the tallies.
+
+    Work is split into shards of SHARD_GAMES, each with an independent seed
+    spawned from `seed`, so results are reproducible for a given seed
+    whatever the number of workers. Shard results are folded into the
+    totals as they finish.
+    """
+    shards = [SHARD_GAMES] * (games // SHARD_GAMES)
+    if games % SHARD_GAMES:
+        shards.append(games % SHARD_GAMES)
+    seeds = np.random.SeedSequence(seed).generate_state(len(shards))
+
+    visits = np.zeros((WINNING_SCORE, WINNING_SCORE, 2), dtype=np.int64)
+    wins = np.zeros_like(visits)
+    played = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_shard, n, int(s)) for n, s in zip(shards, seeds)]
+        for future in as_completed(futures):
+            n, shard_visits, shard_wins = future.result()
+            visits += shard_visits
+            wins += shard_wins
+            played += n
+            if progress:
+                progress(played, games)
+
+    return visits, wins
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate cribbage games for win statistics.")
+    parser.add_argument("--games", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--out", default=STATS_FILE)
+    args = parser.parse_args()
+
+    visits, wins = simulate(
+        args.games, args.workers, args.seed,
+        progress=lambda done, total: print(f"{done}/{total} games", end="\r")
+    )
+    np.savez_compressed(args.out, visits=visits, wins=wins)
+    print(f"\nWrote {args.out}")
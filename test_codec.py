@@ -0,0 +1,100 @@
+import json
+import random
+
+from codec import (
+    COMPRESS_MIN_BYTES, decode_action, decode_game, decode_text,
+    encode_action, encode_game, encode_text,
+)
+from scoring import DECK, card_name
+
+# =====================================================
+# GAMES
+# =====================================================
+
+def random_action(rng):
+    kind = rng.randrange(6)
+    if kind == 0:
+        return {"player": rng.randrange(4), "points": rng.randint(-12, 29)}
+    if kind == 1:
+        return {"round": 1}
+    if kind == 2:
+        return {"player": rng.randrange(4), "points": rng.randint(0, 12), "card": card_name(rng.choice(DECK))}
+    if kind == 3:
+        pile = [card_name(card) for card in rng.sample(DECK, rng.randrange(9))]
+        return {"player": rng.randrange(4), "points": rng.randint(0, 1), "pile": pile}
+    if kind == 4:
+        return {"undo": True}
+    # Anything else still round-trips, through a JSON record
+    return {"round": 1, "played": [card_name(rng.choice(DECK))], "pile": []}
+
+def random_game(rng):
+    players = ["Ann", "Bob", "Zoë", "Dee"][:rng.randint(2, 4)]
+    return {
+        "players": players,
+        "scores": [rng.randint(0, 130) for _ in players],
+        "dealer_index": rng.randrange(len(players)),
+        "round": rng.randint(1, 40),
+        "pegging_count": rng.randint(0, 31),
+        "pegging_pile": [card_name(card) for card in rng.sample(DECK, rng.randrange(8))],
+        "version": rng.randint(0, 5000),
+        "history": [random_action(rng) for _ in range(rng.randrange(200))],
+        "game_id": "%016x" % rng.getrandbits(64),
+    }
+
+# =====================================================
+# TESTS
+# =====================================================
+
+def test_game_round_trip():
+    rng = random.Random(1)
+    for _ in range(500):
+        game = random_game(rng)
+        data = encode_game(game)
+        assert data[0] == 1
+        assert decode_game(data) == game
+
+def test_missing_fields_round_trip():
+    rng = random.Random(2)
+    for _ in range(200):
+        game = random_game(rng)
+        for key in rng.sample(sorted(game), rng.randrange(len(game))):
+            del game[key]
+        assert decode_game(encode_game(game)) == game
+
+def test_out_of_range_falls_back_to_json():
+    game = {"players": ["a", "b"], "scores": [0, 0], "round": -1, "history": []}
+    data = encode_game(game)
+    assert data[:1] == b"{"
+    assert decode_game(data) == game
+
+def test_legacy_json_loads():
+    old = {
+        "players": ["a", "b"], "scores": [3, 4], "dealer_index": 0, "round": 2,
+        "history": [{"scores": [1, 4], "dealer_index": 1, "round": 1, "history": []}],
+    }
+    game = decode_game(json.dumps(old))
+    # The nested history of old snapshots is stripped
+    assert game["history"] == [{"scores": [1, 4], "dealer_index": 1, "round": 1}]
+    assert decode_action('{"player": 1, "points": 2}') == {"player": 1, "points": 2}
+
+def test_action_round_trip():
+    rng = random.Random(3)
+    for _ in range(2000):
+        action = random_action(rng)
+        assert decode_action(encode_action(action)) == action
+    assert len(encode_action({"player": 0, "points": 2})) == 3
+    assert encode_action({"round": 1}) == b"\x01"
+
+def test_text_round_trip():
+    rng = random.Random(4)
+    for _ in range(200):
+        game = random_game(rng)
+        text = encode_text(game)
+        assert decode_text(text) == game
+
+    # Long, repetitive histories are deflated; small games are not
+    game = {"players": ["a", "b"], "scores": [0, 0], "history": [{"player": 0, "points": 2}] * 300}
+    assert len(encode_game(game)) >= COMPRESS_MIN_BYTES
+    assert encode_text(game).startswith("~")
+    assert not encode_text({"players": ["a", "b"]}).startswith("~")
+    assert decode_text('{"players": ["a"]}') == {"players": ["a"]}
@@ -0,0 +1,85 @@
+import random
+
+from pegging import PeggingPile
+from scoring import DECK, card_value, parse_card
+
+# =====================================================
+# REFERENCE SCORER
+# =====================================================
+
+def reference_points(pile):
+    """Points for the last card of `pile`, rescanning the whole pile."""
+    count = sum(card_value(card) for card in pile)
+    points = 2 if count in (15, 31) else 0
+
+    ranks = [card % 13 for card in pile]
+    same = 1
+    while same < len(ranks) and ranks[-1 - same] == ranks[-1]:
+        same += 1
+    points += same * (same - 1)
+
+    # Longest tail of 3+ cards whose ranks are consecutive in any order
+    for length in range(len(ranks), 2, -1):
+        tail = sorted(ranks[-length:])
+        if all(b == a + 1 for a, b in zip(tail, tail[1:])):
+            points += length
+            break
+    return points
+
+def random_piles(n, seed):
+    """Legal counts of up to 31, dealt from a shuffled deck."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        deck = DECK[:]
+        rng.shuffle(deck)
+        pile, count = [], 0
+        for card in deck:
+            if count + card_value(card) > 31:
+                break
+            pile.append(card)
+            count += card_value(card)
+        yield pile
+
+# =====================================================
+# TESTS
+# =====================================================
+
+def cards(names):
+    return [parse_card(name) for name in names.split()]
+
+def test_known_plays():
+    pile = PeggingPile()
+    assert [pile.play(card) for card in cards("7♠ 8♥")] == [0, 2]
+    pile = PeggingPile()
+    assert [pile.play(card) for card in cards("4♠ 4♥ 4♦ 4♣")] == [0, 2, 6, 12]
+    pile = PeggingPile()
+    assert [pile.play(card) for card in cards("3♠ 5♥ 4♦ 6♣ 2♠")] == [0, 0, 3, 4, 5]
+    pile = PeggingPile()
+    assert [pile.play(card) for card in cards("K♠ Q♥ J♦ A♣")] == [0, 0, 3, 2]
+
+def test_play_matches_reference():
+    for pile in random_piles(20000, seed=1):
+        engine = PeggingPile()
+        for i, card in enumerate(pile):
+            assert engine.play(card) == reference_points(pile[:i + 1])
+        assert engine.count == sum(card_value(card) for card in pile)
+
+def test_undo_restores_state():
+    rng = random.Random(2)
+    for pile in random_piles(5000, seed=2):
+        engine = PeggingPile()
+        for i, card in enumerate(pile):
+            # Trying another card and taking it back must leave no trace
+            others = [c for c in DECK if c not in pile and engine.can_play(c)]
+            if others:
+                engine.play(rng.choice(others))
+                engine.undo()
+            assert engine.play(card) == reference_points(pile[:i + 1])
+        assert engine.cards == pile
+
+def test_from_state_and_limit():
+    pile = PeggingPile.from_state(["10♠", "J♥", "5♦"])
+    assert pile.count == 25
+    assert pile.can_play(parse_card("6♣"))
+    assert not pile.can_play(parse_card("7♣"))
+    assert pile.play(parse_card("6♣")) == 2
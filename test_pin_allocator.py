@@ -0,0 +1,71 @@
+import random
+import threading
+
+from pin_allocator import PinAllocator
+
+def test_allocates_every_pin_once():
+    pins = PinAllocator(3)
+    got = [pins.allocate() for _ in range(1000)]
+    assert sorted(got) == [f"{n:03d}" for n in range(1000)]
+    assert pins.allocate() is None
+    assert len(pins) == 0
+
+def test_used_pins_are_skipped():
+    used = {"0003", "0500", "9999"}
+    pins = PinAllocator(4, used)
+    assert len(pins) == 10000 - 3
+    got = set()
+    while (pin := pins.allocate()) is not None:
+        got.add(pin)
+    assert len(got) == 10000 - 3 and not got & used
+
+def test_bad_pins_are_ignored():
+    pins = PinAllocator(2, ["7", "abc", "123"])
+    assert len(pins) == 100
+    pins.release("xyz")
+    assert len(pins) == 100
+
+def test_release_and_sync_against_a_reference():
+    rng = random.Random(1)
+    pins = PinAllocator(2)
+    taken = set()
+    for _ in range(20000):
+        action = rng.random()
+        if action < 0.5:
+            pin = pins.allocate()
+            if len(taken) == 100:
+                assert pin is None
+            else:
+                assert pin not in taken
+                taken.add(pin)
+        elif action < 0.95:
+            pin = f"{rng.randrange(100):02d}"
+            pins.release(pin)
+            taken.discard(pin)
+        else:
+            # Another process changed the database
+            taken = {f"{n:02d}" for n in range(100) if rng.random() < 0.5}
+            pins.sync(taken)
+        assert len(pins) == 100 - len(taken)
+
+    rest = set()
+    while (pin := pins.allocate()) is not None:
+        rest.add(pin)
+    assert rest == {f"{n:02d}" for n in range(100)} - taken
+
+def test_concurrent_allocation_is_unique():
+    pins = PinAllocator(4)
+    got = []
+    lock = threading.Lock()
+
+    def worker():
+        mine = [pins.allocate() for _ in range(1000)]
+        with lock:
+            got.extend(mine)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(set(got)) == 8000
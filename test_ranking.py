@@ -0,0 +1,98 @@
+import random
+import sqlite3
+
+from ranking import Ranking
+
+# =====================================================
+# LEADERBOARD DB
+# =====================================================
+
+# The leaderboard tables as version4.init_aggregate creates them
+
+def leaderboard_db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE leaderboard (player TEXT PRIMARY KEY, total_points INTEGER, generation INTEGER DEFAULT 0)")
+    conn.execute("CREATE TABLE leaderboard_meta (id INTEGER PRIMARY KEY CHECK (id = 0), generation INTEGER)")
+    conn.execute("INSERT INTO leaderboard_meta (id, generation) VALUES (0, 0)")
+    conn.commit()
+    return conn
+
+def bank(conn, scores):
+    """Bank one finished game, as version4.update_leaderboard does."""
+    c = conn.cursor()
+    c.execute("UPDATE leaderboard_meta SET generation = generation + 1")
+    generation = c.execute("SELECT generation FROM leaderboard_meta").fetchone()[0]
+    c.executemany("""
+        INSERT INTO leaderboard (player, total_points, generation) VALUES (?, ?, ?)
+        ON CONFLICT(player) DO UPDATE SET
+            total_points = total_points + excluded.total_points,
+            generation = excluded.generation
+    """, [(player, points, generation) for player, points in scores.items()])
+    conn.commit()
+
+def refresh(ranking, conn):
+    ranking.refresh(conn)
+    # The connection pool rolls back whatever a borrower left open
+    conn.rollback()
+
+def brute_force(totals):
+    ordered = sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+    return [
+        (1 + sum(points > mine for points in totals.values()), player, mine)
+        for player, mine in ordered
+    ]
+
+# =====================================================
+# TESTS
+# =====================================================
+
+def test_matches_brute_force_as_games_are_banked():
+    rng = random.Random(1)
+    conn = leaderboard_db()
+    ranking = Ranking()
+    totals = {}
+    players = [f"Player {i}" for i in range(150)]
+
+    for game in range(1500):
+        scores = {player: rng.randint(0, 121) for player in rng.sample(players, rng.randint(2, 4))}
+        bank(conn, scores)
+        for player, points in scores.items():
+            totals[player] = totals.get(player, 0) + points
+
+        if game % 50 == 0 or game == 1499:
+            refresh(ranking, conn)
+            expected = brute_force(totals)
+            assert len(ranking) == len(expected)
+            assert ranking.page(0, len(expected)) == expected
+            for rank, player, points in expected:
+                assert ranking.rank(player) == (rank, points)
+
+    assert ranking.rank("Nobody") is None
+    assert ranking.index("Nobody") is None
+
+def test_fresh_ranking_matches_incremental_one():
+    rng = random.Random(2)
+    conn = leaderboard_db()
+    incremental = Ranking()
+    for _ in range(200):
+        bank(conn, {f"P{rng.randrange(40)}": rng.randint(0, 30) for _ in range(3)})
+        refresh(incremental, conn)
+
+    fresh = Ranking()
+    refresh(fresh, conn)
+    assert fresh.page(0, 100) == incremental.page(0, 100)
+
+def test_tied_players_are_found_on_their_page():
+    conn = leaderboard_db()
+    bank(conn, {f"P{i:02d}": 100 if i < 40 else i for i in range(60)})
+    ranking = Ranking()
+    refresh(ranking, conn)
+
+    page_size = 25
+    for i in range(60):
+        player = f"P{i:02d}"
+        offset = ranking.index(player) // page_size * page_size
+        assert player in [name for _, name, _ in ranking.page(offset, page_size)]
+    # Everyone on 100 shares first place
+    assert ranking.rank("P39") == (1, 100)
+    assert ranking.rank("P59") == (41, 59)
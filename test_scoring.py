@@ -0,0 +1,87 @@
+import random
+from itertools import combinations
+
+from scoring import DECK, JACK, card_value, parse_card, score_hand, score_hands
+from score_table import lookup_score
+
+# =====================================================
+# REFERENCE SCORER
+# =====================================================
+
+def reference_score(hand, starter, crib=False):
+    """Score by the rules, counting every combination the slow way."""
+    cards = list(hand) + [starter]
+    ranks = [card % 13 for card in cards]
+    points = 0
+
+    for size in range(2, 6):
+        for combo in combinations(cards, size):
+            if sum(card_value(card) for card in combo) == 15:
+                points += 2
+
+    for a, b in combinations(ranks, 2):
+        if a == b:
+            points += 2
+
+    # Only the longest runs count
+    for size in (5, 4, 3):
+        runs = 0
+        for combo in combinations(ranks, size):
+            ordered = sorted(combo)
+            if all(b == a + 1 for a, b in zip(ordered, ordered[1:])):
+                runs += 1
+        if runs:
+            points += size * runs
+            break
+
+    suits = {card // 13 for card in hand}
+    if len(suits) == 1:
+        if starter // 13 in suits:
+            points += 5
+        elif not crib:
+            points += 4
+
+    if any(card % 13 == JACK and card // 13 == starter // 13 for card in hand):
+        points += 1
+
+    return points
+
+def random_hands(n, seed):
+    rng = random.Random(seed)
+    for _ in range(n):
+        cards = rng.sample(DECK, 5)
+        yield cards[:4], cards[4]
+
+# =====================================================
+# TESTS
+# =====================================================
+
+def cards(names):
+    return [parse_card(name) for name in names.split()]
+
+def test_known_hands():
+    # 5 5 5 J with the fourth 5 of the jack's suit
+    assert score_hand(cards("5♠ 5♥ 5♦ J♣"), parse_card("5♣")) == 29
+    assert score_hand(cards("5♠ 5♥ 5♦ 5♣"), parse_card("J♣")) == 28
+    assert score_hand(cards("2♠ 4♥ 6♦ 8♣"), parse_card("K♠")) == 0
+    # Four-card flush counts in the hand but not in the crib
+    hand = cards("2♥ 4♥ 6♥ 8♥")
+    assert score_hand(hand, parse_card("K♠")) == 4
+    assert score_hand(hand, parse_card("K♠"), crib=True) == 0
+    assert score_hand(hand, parse_card("K♥"), crib=True) == 5
+
+def test_score_hand_matches_reference():
+    for hand, starter in random_hands(5000, seed=1):
+        for crib in (False, True):
+            assert score_hand(hand, starter, crib) == reference_score(hand, starter, crib)
+
+def test_score_hands_batch_of_lists():
+    pairs = list(random_hands(2000, seed=2))
+    hands = [hand for hand, _ in pairs]
+    starters = [starter for _, starter in pairs]
+    assert score_hands(hands, starters) == [reference_score(h, s) for h, s in pairs]
+
+def test_lookup_score_matches_scorer():
+    for hand, starter in random_hands(5000, seed=3):
+        for crib in (False, True):
+            assert lookup_score(hand, starter, crib) == score_hand(hand, starter, crib)
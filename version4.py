@@ -2,115 +2,891 @@ import streamlit as st
 import sqlite3
 import random
 import json
-from datetime import datetime
+import logging
+import secrets
+import atexit
+import queue
+import threading
+import time
+import zlib
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 import pandas as pd
+from codec import decode_action, decode_game, encode_action, encode_game
+from scoring import DECK, card_name, card_value, parse_card
+from pegging import PeggingPile
+from score_table import lookup_score
+from discard import best_discards
+from win_probability import win_probabilities
+from pin_allocator import PinAllocator
+from ranking import Ranking
 
 st.set_page_config(page_title="Cribbage Tracker", layout="centered")
 
+log = logging.getLogger("cribbage")
+
+# Games are spread over SHARD_COUNT files by PIN, so games on different
+# shards never wait on the same write lock. DB_FILE holds the leaderboard
+# for every shard. Changing SHARD_COUNT moves PINs to other shards, so only
+# change it when no games are active.
 DB_FILE = "cribbage.db"
+SHARD_FILE = "cribbage-shard-{}.db"
+SHARD_COUNT = 4
+
+PIN_DIGITS = 4
+
+WATCH_REFRESH_SECONDS = 2
+
+POOL_SIZE = 8
+BUSY_TIMEOUT_MS = 5000
+CACHE_SIZE_KB = 8192
+
+# Games untouched for GAME_TTL are archived as "expired" and their PIN
+# freed. The sweeper wakes every SWEEP_INTERVAL_SECONDS and works through
+# SWEEP_BATCH games per transaction so it never holds the write lock long.
+GAME_TTL = timedelta(hours=24)
+SWEEP_INTERVAL_SECONDS = 60
+SWEEP_BATCH = 20
+
+# Taps are queued for a background writer; a full queue makes a tap wait.
+# A locked shard is retried WRITE_RETRIES times before the taps are given
+# up, and nothing waits on the writer for more than FLUSH_TIMEOUT_SECONDS.
+# The writer remembers the last VERSIONS_KEPT games it has written to.
+WRITE_QUEUE_SIZE = 1000
+WRITE_RETRIES = 5
+FLUSH_TIMEOUT_SECONDS = 15
+VERSIONS_KEPT = 4096
+
+# Decoded games kept per process for joining and watching devices
+GAME_CACHE_SIZE = 256
+
+LEADERBOARD_PAGE_SIZE = 25
 
 # =====================================================
 # DATABASE
 # =====================================================
 
-def get_conn():
-    return sqlite3.connect(DB_FILE, check_same_thread=False)
+class ConnectionPool:
+    """Long-lived SQLite connections shared by every session in the process.
+
+    Connections run in WAL mode so readers never wait on a writer. Up to
+    `size` idle connections are kept; extra ones are opened under load and
+    closed when handed back.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
 
-def init_db():
-    conn = get_conn()
+    def _connect(self):
+        conn = sqlite3.connect(
+            self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        return conn
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        try:
+            yield conn
+        finally:
+            # Never hand out a connection with a half-finished transaction
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+class ShardRouter:
+    """A connection pool per shard file plus one for the aggregate DB."""
+
+    def __init__(self, shard_paths, aggregate_path):
+        self.shards = [ConnectionPool(path) for path in shard_paths]
+        self.aggregate = ConnectionPool(aggregate_path)
+
+    def shard_of(self, pin):
+        return zlib.crc32(pin.encode()) % len(self.shards)
+
+    def pool_for(self, pin):
+        return self.shards[self.shard_of(pin)]
+
+def init_shard(conn):
     c = conn.cursor()
+    # Under the write lock, so processes starting together upgrade it once
+    c.execute("BEGIN IMMEDIATE")
 
     c.execute("""
         CREATE TABLE IF NOT EXISTS active_games (
             pin TEXT PRIMARY KEY,
             data TEXT,
-            updated_at TEXT
+            updated_at TEXT,
+            version INTEGER DEFAULT 0,
+            game_id TEXT
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS game_events (
+            pin TEXT,
+            seq INTEGER,
+            action TEXT,
+            created_at TEXT,
+            PRIMARY KEY (pin, seq)
+        )
+    """)
+
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS game_snapshots (
+            pin TEXT PRIMARY KEY,
+            seq INTEGER,
+            data TEXT
         )
     """)
 
+    # pending_points marks finished games not yet added to the leaderboard
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS game_archive (
+            id INTEGER PRIMARY KEY,
+            pin TEXT,
+            data TEXT,
+            status TEXT,
+            archived_at TEXT,
+            pending_points INTEGER DEFAULT 0
+        )
+    """)
+
+    c.execute("CREATE INDEX IF NOT EXISTS active_games_updated_at ON active_games (updated_at)")
+    c.execute("CREATE INDEX IF NOT EXISTS game_archive_pending ON game_archive (pending_points) WHERE pending_points")
+
+    add_version_column(c)
+    add_game_id_column(c)
+
+    conn.commit()
+
+def add_version_column(c):
+    columns = [row[1] for row in c.execute("PRAGMA table_info(active_games)")]
+    if "version" not in columns:
+        c.execute("ALTER TABLE active_games ADD COLUMN version INTEGER DEFAULT 0")
+        # Databases from before the event log have no events to count
+        c.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='game_events'")
+        if c.fetchone():
+            c.execute("""
+                UPDATE active_games SET version = (
+                    SELECT COALESCE(MAX(seq), 0) FROM game_events e
+                    WHERE e.pin = active_games.pin
+                )
+            """)
+
+def add_game_id_column(c):
+    """Give every stored game an id, including games from before ids."""
+    columns = [row[1] for row in c.execute("PRAGMA table_info(active_games)")]
+    if "game_id" not in columns:
+        c.execute("ALTER TABLE active_games ADD COLUMN game_id TEXT")
+    c.execute("UPDATE active_games SET game_id = lower(hex(randomblob(8))) WHERE game_id IS NULL")
+
+def init_aggregate(conn):
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+
     c.execute("""
         CREATE TABLE IF NOT EXISTS leaderboard (
             player TEXT PRIMARY KEY,
-            total_points INTEGER
+            total_points INTEGER,
+            generation INTEGER DEFAULT 0
         )
     """)
 
+    columns = [row[1] for row in c.execute("PRAGMA table_info(leaderboard)")]
+    if "generation" not in columns:
+        c.execute("ALTER TABLE leaderboard ADD COLUMN generation INTEGER DEFAULT 0")
+
+    c.execute("CREATE INDEX IF NOT EXISTS leaderboard_points ON leaderboard (total_points DESC)")
+    c.execute("CREATE INDEX IF NOT EXISTS leaderboard_generation ON leaderboard (generation)")
+
+    # Bumped by every banked game; leaderboard.generation is the bump that
+    # last changed each player
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS leaderboard_meta (
+            id INTEGER PRIMARY KEY CHECK (id = 0),
+            generation INTEGER
+        )
+    """)
+    c.execute("INSERT OR IGNORE INTO leaderboard_meta (id, generation) VALUES (0, 0)")
+
+    # (shard, game_archive.id) of every game whose points are banked
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS banked_games (
+            shard INTEGER,
+            archive_id INTEGER,
+            PRIMARY KEY (shard, archive_id)
+        )
+    """)
+
+    conn.commit()
+
+# Tables that lived in DB_FILE before it was sharded, with the columns to
+# move. Every row keeps its key, so moving the same rows twice is harmless.
+_SHARDED_TABLES = {
+    "game_events": "pin, seq, action, created_at",
+    "game_snapshots": "pin, seq, data",
+    "game_archive": "id, pin, data, status, archived_at",
+    "active_games": "pin, data, updated_at, version",
+}
+
+def move_games_to_shards(conn, router):
+    """One-off move of games out of a DB_FILE from before sharding.
+
+    Runs under the DB_FILE write lock, so a second process starting at the
+    same time waits and then finds the tables already gone. Rows reach the
+    shards before the tables are dropped; if the move dies part way it is
+    simply run again.
+    """
+    c = conn.cursor()
+    c.execute("BEGIN IMMEDIATE")
+    tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    if "active_games" in tables:
+        add_version_column(c)
+
+    for table, columns in _SHARDED_TABLES.items():
+        if table not in tables:
+            continue
+
+        by_shard = defaultdict(list)
+        for row in c.execute(f"SELECT {columns} FROM {table}"):
+            by_shard[router.shard_of(row[0])].append(row)
+
+        marks = ", ".join("?" * len(columns.split(", ")))
+        for shard, rows in by_shard.items():
+            with router.shards[shard].connection() as shard_conn:
+                shard_conn.executemany(
+                    f"INSERT OR IGNORE INTO {table} ({columns}) VALUES ({marks})", rows
+                )
+                if table == "active_games":
+                    add_game_id_column(shard_conn.cursor())
+                shard_conn.commit()
+
+        c.execute(f"DROP TABLE {table}")
     conn.commit()
-    conn.close()
 
-init_db()
+@st.cache_resource
+def get_router():
+    router = ShardRouter([SHARD_FILE.format(i) for i in range(SHARD_COUNT)], DB_FILE)
+    for pool in router.shards:
+        with pool.connection() as conn:
+            init_shard(conn)
+    with router.aggregate.connection() as conn:
+        init_aggregate(conn)
+        move_games_to_shards(conn, router)
+    return router
+
+def get_conn(pin):
+    """A connection to the shard holding `pin`."""
+    return get_router().pool_for(pin).connection()
+
+def get_aggregate_conn():
+    return get_router().aggregate.connection()
+
+def active_pins(router):
+    pins = []
+    for pool in router.shards:
+        with pool.connection() as conn:
+            pins += [row[0] for row in conn.execute("SELECT pin FROM active_games")]
+    return pins
+
+@st.cache_resource
+def get_pins():
+    """Free PINs for the process, seeded from the games already stored.
+
+    Each process has its own pool and only hears about the games it ends
+    itself, so the sweeper re-syncs it with the database on every pass.
+    """
+    return PinAllocator(PIN_DIGITS, active_pins(get_router()))
 
 # =====================================================
 # GAME DB
 # =====================================================
 
-def save_game(pin, game):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute(
-        "REPLACE INTO active_games (pin, data, updated_at) VALUES (?, ?, ?)",
-        (pin, json.dumps(game), datetime.utcnow().isoformat())
-    )
-    conn.commit()
-    conn.close()
+# A game is stored as its starting state in active_games plus an append-only
+# log of actions in game_events. Every SNAPSHOT_EVERY actions the full state
+# is written to game_snapshots so loading only replays the trailing events.
+# active_games.version is the seq of the last event, which lets a device
+# tell when others have saved. Actions are written by GameWriter below.
+# PINs are reused, so each game also gets a random game_id; a device holds
+# on to it and only ever writes to the game with that id.
+# Games and actions are stored in the binary format from codec.py; rows
+# written as JSON before it still load.
+
+SNAPSHOT_EVERY = 20
+
+def create_game(game):
+    """Store a new game under a random free PIN and return the PIN.
+
+    Returns None when every PIN is taken.
+    """
+    game["version"] = 0
+    data = encode_game(game)
+    game["game_id"] = secrets.token_hex(8)
+    pins = get_pins()
+    while True:
+        pin = pins.allocate()
+        if pin is None:
+            return None
+
+        try:
+            with get_conn(pin) as conn:
+                c = conn.cursor()
+                c.execute(
+                    "INSERT INTO active_games (pin, data, updated_at, version, game_id) VALUES (?, ?, ?, 0, ?)",
+                    (pin, data, datetime.utcnow().isoformat(), game["game_id"])
+                )
+                c.execute("DELETE FROM game_events WHERE pin=?", (pin,))
+                c.execute("DELETE FROM game_snapshots WHERE pin=?", (pin,))
+                conn.commit()
+            # The PIN may have been used before
+            get_game_cache().invalidate(pin)
+            return pin
+        except sqlite3.IntegrityError:
+            # Another process on the same database got there first; the
+            # PIN stays out of the pool until the sweeper next re-syncs it
+            continue
+
+def load_game(pin, c=None):
+    """Rebuild a game; pass a cursor to read inside the caller's transaction."""
+    if c is None:
+        with get_conn(pin) as conn:
+            return load_game(pin, conn.cursor())
 
-def load_game(pin):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT data FROM active_games WHERE pin=?", (pin,))
+    c.execute("""
+        SELECT a.data, a.game_id, s.data, COALESCE(s.seq, 0)
+        FROM active_games a LEFT JOIN game_snapshots s ON s.pin = a.pin
+        WHERE a.pin=?
+    """, (pin,))
     row = c.fetchone()
-    conn.close()
-    return json.loads(row[0]) if row else None
+    if not row:
+        return None
 
-def delete_game(pin):
-    conn = get_conn()
-    c = conn.cursor()
+    base, game_id, snapshot, seq = row
+    c.execute(
+        "SELECT seq, action FROM game_events WHERE pin=? AND seq>? ORDER BY seq",
+        (pin, seq)
+    )
+    actions = c.fetchall()
+
+    game = decode_game(snapshot or base)
+    for seq, action in actions:
+        replay_action(game, decode_action(action))
+    game["version"] = seq
+    game["game_id"] = game_id
+    return game
+
+def delete_game(pin, c):
+    """Remove a game inside the caller's transaction; the caller frees the
+    PIN and marks the game gone once it commits."""
     c.execute("DELETE FROM active_games WHERE pin=?", (pin,))
-    conn.commit()
-    conn.close()
+    c.execute("DELETE FROM game_events WHERE pin=?", (pin,))
+    c.execute("DELETE FROM game_snapshots WHERE pin=?", (pin,))
+
+def finish_game(pin, game):
+    """Archive the game and free the PIN, then bank its scores.
+
+    The archive row is written with pending_points set in the same shard
+    transaction that deletes the game, so if the leaderboard update never
+    happens the sweeper finds the row and banks it later. Returns False,
+    and changes nothing, if the game was already finished or expired.
+    """
+    # Every queued tap is committed before the final state is read
+    get_writer().flush(pin)
+    router = get_router()
+    with router.pool_for(pin).connection() as conn:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        # Holding the write lock, pick up taps made on other devices
+        stored = load_game(pin, c)
+        if stored is None or stored["game_id"] != game["game_id"]:
+            conn.rollback()
+            return False
+        game = stored
+        c.execute(
+            "INSERT INTO game_archive (pin, data, status, archived_at, pending_points) VALUES (?, ?, ?, ?, 1)",
+            (pin, json.dumps(game), "finished", datetime.utcnow().isoformat())
+        )
+        archive_id = c.lastrowid
+        delete_game(pin, c)
+        conn.commit()
+    get_writer().mark_gone(pin, game["game_id"])
+    get_pins().release(pin)
+    bank_points(router, router.shard_of(pin), archive_id, game)
+    return True
+
+def probe_game(pin):
+    """Cheap change check: (version, game_id, updated_at) without loading
+    the game."""
+    with get_conn(pin) as conn:
+        c = conn.cursor()
+        c.execute("SELECT version, game_id, updated_at FROM active_games WHERE pin=?", (pin,))
+        return c.fetchone()
 
 def pin_exists(pin):
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT 1 FROM active_games WHERE pin=?", (pin,))
-    exists = c.fetchone() is not None
-    conn.close()
-    return exists
+    with get_conn(pin) as conn:
+        c = conn.cursor()
+        c.execute("SELECT 1 FROM active_games WHERE pin=?", (pin,))
+        return c.fetchone() is not None
 
 # =====================================================
-# LEADERBOARD
+# GAME CACHE
 # =====================================================
 
-def update_leaderboard(game):
-    conn = get_conn()
-    c = conn.cursor()
+class GameCache:
+    """LRU of decoded games shared by every session in the process.
+
+    Lookups are by (pin, version, game_id), so a save anywhere, or a new
+    game under the same PIN, makes the old entry a miss; the writer also
+    drops it as soon as it commits a new version. One entry is kept per PIN
+    and the least recently used PIN is evicted past `size`.
+    """
+
+    def __init__(self, size=GAME_CACHE_SIZE):
+        self.size = size
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def get(self, pin, version, game_id):
+        with self._lock:
+            entry = self._games.get(pin)
+            if entry is None or entry["version"] != version or entry["game_id"] != game_id:
+                self.misses += 1
+                return None
+            self._games.move_to_end(pin)
+            self.hits += 1
+            return entry
+
+    def put(self, pin, game):
+        with self._lock:
+            self._games[pin] = game
+            self._games.move_to_end(pin)
+            while len(self._games) > self.size:
+                self._games.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, pin, version=None):
+        """Drop `pin`, or only its entries older than `version`."""
+        with self._lock:
+            entry = self._games.get(pin)
+            if entry is not None and (version is None or entry["version"] < version):
+                del self._games[pin]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self._games),
+            }
+
+@st.cache_resource
+def get_game_cache():
+    return GameCache()
+
+def copy_game(game):
+    """Copy deep enough that replaying actions on it can't touch the original."""
+    return {k: list(v) if isinstance(v, list) else v for k, v in game.items()}
+
+def get_game(pin, probe=None):
+    """load_game through the shared cache; pass probe_game's row if already
+    probed."""
+    if probe is None:
+        probe = probe_game(pin)
+        if probe is None:
+            return None
+    version, game_id = probe[:2]
+
+    cache = get_game_cache()
+    game = cache.get(pin, version, game_id)
+    if game is None:
+        game = load_game(pin)
+        if game is None:
+            return None
+        cache.put(pin, game)
+    return copy_game(game)
+
+# =====================================================
+# WRITE-BEHIND QUEUE
+# =====================================================
 
-    for player, score in zip(game["players"], game["scores"]):
-        c.execute("SELECT total_points FROM leaderboard WHERE player=?", (player,))
-        row = c.fetchone()
+GAME_GONE = -1
+SAVE_FAILED = -2
+
+class GameWriter:
+    """Background thread that appends queued actions to the event log.
+
+    submit() returns straight away, so a tap never waits on a commit. The
+    thread takes everything queued so far in one go: the actions for each
+    PIN are appended together, and all PINs on a shard share a single
+    transaction, so a burst of taps costs one commit. Actions land on top
+    of whatever version is stored, as deltas, exactly as if each device had
+    retried its save against the latest state, but only if the PIN still
+    holds the game they were made in.
+    """
+
+    def __init__(self, router, cache, size=WRITE_QUEUE_SIZE):
+        self._router = router
+        self._cache = cache
+        self._queue = queue.Queue(maxsize=size)
+        self._done = threading.Condition()
+        self._pending = defaultdict(int)
+        self._versions = OrderedDict()
+        threading.Thread(target=self._run, daemon=True, name="game-writer").start()
+
+    def submit(self, pin, game_id, action):
+        with self._done:
+            self._pending[pin] += 1
+        self._queue.put((pin, game_id, action))
+
+    def flush(self, pin=None, timeout=FLUSH_TIMEOUT_SECONDS):
+        """Wait until everything queued for `pin` (or every PIN) is committed.
+
+        Raises TimeoutError if the writer hasn't got there in `timeout`.
+        """
+        with self._done:
+            if not self._done.wait_for(
+                lambda: not (self._pending.get(pin) if pin else self._pending), timeout
+            ):
+                raise TimeoutError("game writer is not keeping up")
+
+    def committed_version(self, pin, game_id):
+        """Version after this process last wrote to the game: None if it
+        hasn't, GAME_GONE if the game had been finished or expired, or
+        SAVE_FAILED if the last taps couldn't be stored."""
+        with self._done:
+            return self._versions.get((pin, game_id))
+
+    def mark_gone(self, pin, game_id):
+        """Record that the game was finished or expired, so devices still
+        on it are sent back on their next tap."""
+        with self._done:
+            self._set_version((pin, game_id), GAME_GONE)
+
+    def _set_version(self, key, version):
+        # Least recently written first; a game that falls off the end just
+        # reads as None, and is back on its next commit
+        self._versions[key] = version
+        self._versions.move_to_end(key)
+        if len(self._versions) > VERSIONS_KEPT:
+            self._versions.popitem(last=False)
+
+    def _run(self):
+        while True:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            by_shard = defaultdict(lambda: defaultdict(list))
+            for pin, game_id, action in items:
+                by_shard[self._router.shard_of(pin)][(pin, game_id)].append(action)
+
+            for shard, actions in by_shard.items():
+                try:
+                    versions = self._commit(self._router.shards[shard], actions)
+                except Exception:
+                    # Drop this batch but keep the thread alive for the rest
+                    log.exception("Saving %d games on shard %d failed", len(actions), shard)
+                    versions = None
+
+                with self._done:
+                    for key, game_actions in actions.items():
+                        pin = key[0]
+                        self._pending[pin] -= len(game_actions)
+                        if not self._pending[pin]:
+                            del self._pending[pin]
+                        if versions is None:
+                            self._set_version(key, SAVE_FAILED)
+                            self._cache.invalidate(pin)
+                        else:
+                            self._set_version(key, versions.get(key, GAME_GONE))
+                            self._cache.invalidate(pin, versions.get(key))
+                    self._done.notify_all()
+
+    def _commit(self, pool, actions):
+        for attempt in range(WRITE_RETRIES):
+            try:
+                return self._append(pool, actions)
+            except sqlite3.OperationalError as e:
+                # Only a lock held past the busy timeout is worth retrying
+                message = str(e)
+                if "locked" not in message and "busy" not in message:
+                    raise
+                if attempt == WRITE_RETRIES - 1:
+                    raise
+                time.sleep(0.1 * (attempt + 1))
+
+    def _append(self, pool, actions):
+        now = datetime.utcnow().isoformat()
+        versions = {}
+        with pool.connection() as conn:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            for (pin, game_id), game_actions in actions.items():
+                row = c.execute("SELECT version, game_id FROM active_games WHERE pin=?", (pin,)).fetchone()
+                if row is None or row[1] != game_id:
+                    # Finished, expired, or the PIN now holds a newer game
+                    continue
+
+                start = row[0]
+                version = start + len(game_actions)
+                c.executemany(
+                    "INSERT INTO game_events (pin, seq, action, created_at) VALUES (?, ?, ?, ?)",
+                    [(pin, start + i + 1, encode_action(action), now) for i, action in enumerate(game_actions)]
+                )
+                c.execute(
+                    "UPDATE active_games SET version=?, updated_at=? WHERE pin=?",
+                    (version, now, pin)
+                )
+                if version // SNAPSHOT_EVERY > start // SNAPSHOT_EVERY:
+                    # The id lives in active_games, not in the snapshot
+                    snapshot = load_game(pin, c)
+                    del snapshot["game_id"]
+                    c.execute(
+                        "REPLACE INTO game_snapshots (pin, seq, data) VALUES (?, ?, ?)",
+                        (pin, version, encode_game(snapshot))
+                    )
+                versions[(pin, game_id)] = version
+            conn.commit()
+        return versions
+
+@st.cache_resource
+def get_writer():
+    writer = GameWriter(get_router(), get_game_cache())
+    atexit.register(writer.flush)
+    return writer
 
-        if row:
-            c.execute("UPDATE leaderboard SET total_points=? WHERE player=?",
-                      (row[0] + score, player))
+# =====================================================
+# EXPIRY SWEEPER
+# =====================================================
+
+def sweep_expired(pool, pins, writer, batch=SWEEP_BATCH, skip=None):
+    """Archive up to `batch` games idle for longer than GAME_TTL.
+
+    Returns how many were looked at. The oldest are taken first through the
+    updated_at index, under the write lock, so a device saving at the same
+    moment either lands first (and the game is no longer stale) or finds it
+    gone and returns to the PIN screen. A game that fails to load is
+    logged, left where it is and added to `skip`, so later batches pass
+    over it.
+    """
+    if skip is None:
+        skip = set()
+    cutoff = (datetime.utcnow() - GAME_TTL).isoformat()
+    with pool.connection() as conn:
+        c = conn.cursor()
+        c.execute("BEGIN IMMEDIATE")
+        c.execute(
+            "SELECT pin, game_id FROM active_games WHERE updated_at < ? ORDER BY updated_at LIMIT ?",
+            (cutoff, batch + len(skip))
+        )
+        expired = [row for row in c.fetchall() if row not in skip][:batch]
+        now = datetime.utcnow().isoformat()
+        moved = []
+        for pin, game_id in expired:
+            try:
+                data = json.dumps(load_game(pin, c))
+            except Exception:
+                log.exception("Can't load expired game %s; leaving it in place", pin)
+                skip.add((pin, game_id))
+                continue
+            c.execute(
+                "INSERT INTO game_archive (pin, data, status, archived_at) VALUES (?, ?, ?, ?)",
+                (pin, data, "expired", now)
+            )
+            delete_game(pin, c)
+            moved.append((pin, game_id))
+        conn.commit()
+
+    for pin, game_id in moved:
+        writer.mark_gone(pin, game_id)
+        pins.release(pin)
+    return len(expired)
+
+def run_sweeper(router, pins, writer):
+    # (pin, game_id) of games that failed to load, kept while they are stored
+    skip = set()
+    while True:
+        try:
+            bank_pending(router)
+            for pool in router.shards:
+                while sweep_expired(pool, pins, writer, SWEEP_BATCH, skip) == SWEEP_BATCH:
+                    # Let waiting writers in between batches
+                    time.sleep(0.05)
+            # Pick up PINs freed, or taken, by other processes
+            active = set(active_pins(router))
+            pins.sync(active)
+            skip.difference_update([key for key in skip if key[0] not in active])
+        except Exception:
+            # Never let one bad pass end expiry for the rest of the process
+            log.exception("Sweeping expired games failed")
+        time.sleep(SWEEP_INTERVAL_SECONDS)
+
+@st.cache_resource
+def start_sweeper():
+    """One background sweeper per process."""
+    thread = threading.Thread(target=run_sweeper, args=(get_router(), get_pins(), get_writer()), daemon=True, name="game-sweeper")
+    thread.start()
+    return thread
+
+# =====================================================
+# LEADERBOARD
+# =====================================================
+
+def update_leaderboard(game, c):
+    c.execute("UPDATE leaderboard_meta SET generation = generation + 1")
+    generation = c.execute("SELECT generation FROM leaderboard_meta").fetchone()[0]
+    c.executemany("""
+        INSERT INTO leaderboard (player, total_points, generation) VALUES (?, ?, ?)
+        ON CONFLICT(player) DO UPDATE SET
+            total_points = total_points + excluded.total_points,
+            generation = excluded.generation
+    """, [(player, points, generation) for player, points in zip(game["players"], game["scores"])])
+
+def bank_points(router, shard, archive_id, game):
+    """Add a finished game's scores to the leaderboard exactly once.
+
+    banked_games records each (shard, archive id) in the same aggregate
+    transaction as the points, so a retry after a crash is a no-op.
+    """
+    with router.aggregate.connection() as conn:
+        c = conn.cursor()
+        try:
+            c.execute("INSERT INTO banked_games (shard, archive_id) VALUES (?, ?)", (shard, archive_id))
+        except sqlite3.IntegrityError:
+            pass
         else:
-            c.execute("INSERT INTO leaderboard (player, total_points) VALUES (?, ?)",
-                      (player, score))
+            update_leaderboard(game, c)
+            conn.commit()
+
+    with router.shards[shard].connection() as conn:
+        conn.execute("UPDATE game_archive SET pending_points=0 WHERE id=?", (archive_id,))
+        conn.commit()
+
+def bank_pending(router):
+    """Bank finished games whose leaderboard update didn't happen."""
+    for shard, pool in enumerate(router.shards):
+        with pool.connection() as conn:
+            rows = conn.execute("SELECT id, data FROM game_archive WHERE pending_points").fetchall()
+        for archive_id, data in rows:
+            try:
+                bank_points(router, shard, archive_id, json.loads(data))
+            except Exception:
+                log.exception("Can't bank archived game %d on shard %d", archive_id, shard)
+
+@st.cache_resource
+def get_ranking():
+    return Ranking()
+
+def current_ranking():
+    ranking = get_ranking()
+    with get_aggregate_conn() as conn:
+        ranking.refresh(conn)
+    return ranking
 
-    conn.commit()
-    conn.close()
+# =====================================================
+# GAME ACTIONS
+# =====================================================
 
-def get_leaderboard():
-    conn = get_conn()
-    c = conn.cursor()
-    c.execute("SELECT player, total_points FROM leaderboard ORDER BY total_points DESC")
-    rows = c.fetchall()
-    conn.close()
-    return rows
+# The undo history is a log of small reversible deltas, not snapshots:
+#   {"player": i, "points": n}   player i pegged n points
+#   {"round": 1}                 new round, dealer passes to the next player
+# Score deltas from the pegging panel also carry the pile change:
+#   "card": "5♥"                 the card laid on the pegging pile
+#   "pile": [...]                go or 31, the pile that was cleared
+# A new round clears the pegging, so if any cards were played that hand it
+# also carries what undo needs to put them back:
+#   "played": [...], "pile": [...]
+# The event log in game_events also records {"undo": true}.
+#
+# pegging_pile is the current count; played_cards is every card pegged this
+# hand, across counts, so none can be played twice.
+
+def apply_action(game, action):
+    if "round" in action:
+        game["dealer_index"] = (game["dealer_index"] + 1) % len(game["players"])
+        game["round"] += 1
+        game["pegging_pile"] = []
+        game["pegging_count"] = 0
+        game["played_cards"] = []
+    else:
+        game["scores"][action["player"]] += action["points"]
+        if "card" in action:
+            # Games from before played_cards start from the current count
+            game.setdefault("played_cards", list(game.get("pegging_pile", []))).append(action["card"])
+            game.setdefault("pegging_pile", []).append(action["card"])
+            game["pegging_count"] = game.get("pegging_count", 0) + card_value(parse_card(action["card"]))
+        elif "pile" in action:
+            game["pegging_pile"] = []
+            game["pegging_count"] = 0
+    game["history"].append(action)
+
+def undo_action(game):
+    if not game["history"]:
+        return
+    action = game["history"].pop()
+    if "scores" in action:
+        # Snapshot left over from the old history format; copied, since the
+        # entry may still be held by the shared game cache
+        game["scores"] = list(action["scores"])
+        game["dealer_index"] = action["dealer_index"]
+        game["round"] = action["round"]
+    elif "round" in action:
+        game["dealer_index"] = (game["dealer_index"] - 1) % len(game["players"])
+        game["round"] -= 1
+        game["pegging_pile"] = list(action.get("pile", []))
+        game["pegging_count"] = sum(card_value(parse_card(name)) for name in game["pegging_pile"])
+        game["played_cards"] = list(action.get("played", []))
+    else:
+        game["scores"][action["player"]] -= action["points"]
+        if "card" in action:
+            game["pegging_pile"].pop()
+            game["pegging_count"] -= card_value(parse_card(action["card"]))
+            if game.get("played_cards"):
+                game["played_cards"].pop()
+        elif "pile" in action:
+            game["pegging_pile"] = list(action["pile"])
+            game["pegging_count"] = sum(card_value(parse_card(name)) for name in action["pile"])
+
+def replay_action(game, action):
+    if "undo" in action:
+        undo_action(game)
+    else:
+        apply_action(game, action)
+
+def played_cards(game):
+    return game.get("played_cards", game.get("pegging_pile", []))
+
+def round_action(game):
+    action = {"round": 1}
+    played = played_cards(game)
+    if played:
+        action["played"] = list(played)
+        action["pile"] = list(game.get("pegging_pile", []))
+    return action
 
 # =====================================================
 # SESSION INIT
 # =====================================================
 
+start_sweeper()
+
 if "page" not in st.session_state:
     st.session_state.page = "pin"
 
@@ -120,6 +896,9 @@ if "current_pin" not in st.session_state:
 if "game" not in st.session_state:
     st.session_state.game = None
 
+if "watch_game" not in st.session_state:
+    st.session_state.watch_game = None
+
 # =====================================================
 # PIN SCREEN
 # =====================================================
@@ -127,11 +906,17 @@ if "game" not in st.session_state:
 def pin_screen():
     st.title("🃏 Cribbage Tracker")
 
-    pin = st.text_input("Enter 4 Digit PIN", max_chars=4)
+    pin = st.text_input(f"Enter {PIN_DIGITS} Digit PIN", max_chars=PIN_DIGITS)
 
     if st.button("Join Game", width="stretch", type="primary", icon="✅"):
-        if len(pin) == 4 and pin.isdigit():
-            game = load_game(pin)
+        if len(pin) == PIN_DIGITS and pin.isdigit():
+            # Pick up taps still queued by other sessions in this process
+            try:
+                get_writer().flush(pin)
+            except TimeoutError:
+                st.error("Saving is taking too long. Try again in a moment.")
+                return
+            game = get_game(pin)
             if game:
                 st.session_state.current_pin = pin
                 st.session_state.game = game
@@ -140,7 +925,19 @@ def pin_screen():
             else:
                 st.error("No game found with that PIN.")
         else:
-            st.error("PIN must be 4 digits.")
+            st.error(f"PIN must be {PIN_DIGITS} digits.")
+
+    if st.button("Watch Game", width="stretch", icon="👀"):
+        if len(pin) == PIN_DIGITS and pin.isdigit():
+            if pin_exists(pin):
+                st.session_state.current_pin = pin
+                st.session_state.watch_game = None
+                st.session_state.page = "watch"
+                st.rerun()
+            else:
+                st.error("No game found with that PIN.")
+        else:
+            st.error(f"PIN must be {PIN_DIGITS} digits.")
 
     st.divider()
 
@@ -148,6 +945,13 @@ def pin_screen():
         st.session_state.page = "create"
         st.rerun()
 
+    with st.expander("Server stats"):
+        stats = get_game_cache().stats()
+        st.caption(
+            f"Game cache: {stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evictions, {stats['size']} cached"
+        )
+
 # =====================================================
 # CREATE GAME
 # =====================================================
@@ -159,10 +963,6 @@ def create_game_screen():
 
     st.divider()
 
-    pin = st.text_input("Create 4 Digit Game PIN", max_chars=4)
-
-    st.divider()
-
     names = []
     for i in range(num_players):
         names.append(st.text_input(f"Player {i+1} Name", key=f"name_create_{i}").title())
@@ -173,14 +973,6 @@ def create_game_screen():
 
     with col1:
         if st.button("Start Game", type="primary", width="stretch", icon="🏁"):
-            if not (len(pin) == 4 and pin.isdigit()):
-                st.error("PIN must be exactly 4 digits.")
-                return
-
-            if pin_exists(pin):
-                st.error("PIN already in use.")
-                return
-
             if not all(names):
                 st.error("Enter all player names.")
                 return
@@ -190,10 +982,15 @@ def create_game_screen():
                 "scores": [0] * num_players,
                 "dealer_index": random.randint(0, num_players - 1),
                 "round": 1,
+                "pegging_count": 0,
+                "pegging_pile": [],
                 "history": []
             }
 
-            save_game(pin, game)
+            pin = create_game(game)
+            if pin is None:
+                st.error("No free game PINs right now. Try again later.")
+                return
 
             st.session_state.current_pin = pin
             st.session_state.game = game
@@ -214,29 +1011,76 @@ def confirm_undo():
     if st.button("Yes, Undo", width="stretch", icon="⚠️"):
         game = st.session_state.game
         if game["history"]:
-            previous_state = game["history"].pop()
-            st.session_state.game = previous_state
-            save_game(st.session_state.current_pin, previous_state)
+            apply_and_save({"undo": True})
+        st.session_state.pop("refresh_page", None)
         st.rerun()
 
 # =====================================================
 # GAME SCREEN
 # =====================================================
 
-def game_screen():
-    game = st.session_state.game
+# Score buttons save in their on_click callback, before the fragment they
+# sit in reruns, so a tap only redraws that fragment. The whole page is
+# redrawn when the change shows up elsewhere (Split to Jack, New Round moving
+# the dealer, or a shift in the win chances) or when other devices saved in
+# between and every panel needs refreshing.
+#
+# Pegging taps pass a function of the game instead of an action, so their
+# points are worked out against the game the action is applied to, after
+# any reload; it returns None to drop the tap.
+
+def apply_and_save(action, refresh_page=False):
     pin = st.session_state.current_pin
+    game = st.session_state.game
+    game_id = game["game_id"]
+    writer = get_writer()
+
+    committed = writer.committed_version(pin, game_id)
+    if committed == SAVE_FAILED or (committed is not None and committed > game["version"]):
+        # Other devices saved since this one last loaded, or this device's
+        # last taps were lost; either way start again from what is stored
+        if committed == SAVE_FAILED:
+            st.toast("Your last taps couldn't be saved, so the game was reloaded.", icon="⚠️")
+        try:
+            writer.flush(pin)
+        except TimeoutError:
+            st.toast("Saving is taking too long. Try again in a moment.", icon="⚠️")
+            return
+        game = get_game(pin)
+        refresh_page = True
+
+    if committed == GAME_GONE or game is None or game["game_id"] != game_id:
+        # Finished or removed from another device
+        st.session_state.game = None
+        st.session_state.page = "pin"
+        st.session_state.current_pin = None
+        st.session_state.refresh_page = True
+        return
+
+    st.session_state.game = game
+    st.session_state.refresh_page = refresh_page
+
+    if callable(action):
+        action = action(game)
+        if action is None:
+            return
 
-    def record_history():
-        snapshot = json.loads(json.dumps(game))
-        game["history"].append(snapshot)
+    shown = win_row(game)
+    replay_action(game, action)
+    game["version"] += 1
+    writer.submit(pin, game_id, action)
 
-    def apply_and_save():
-        st.session_state.game = game
-        save_game(pin, game)
+    if win_row(game) != shown:
+        st.session_state.refresh_page = True
+
+def refresh_page_if_needed():
+    if st.session_state.pop("refresh_page", False):
         st.rerun()
 
-    st.title("🃏 Cribbage Tracker")
+@st.fragment
+def dealer_controls():
+    refresh_page_if_needed()
+    game = st.session_state.game
 
     col1, col2 = st.columns(2)
 
@@ -244,63 +1088,190 @@ def game_screen():
         st.markdown(f"### Round {game['round']}")
 
     with col2:
-        st.markdown(f"### Game PIN: {pin}")
+        st.markdown(f"### Game PIN: {st.session_state.current_pin}")
 
     with st.container(border=True):
         dealer = game["players"][game["dealer_index"]]
         st.markdown(f"#### Dealer: **{dealer}**")
 
-        if st.button("New Round", width="stretch", type="primary"):
-            record_history()
-            game["dealer_index"] = (game["dealer_index"] + 1) % len(game["players"])
-            game["round"] += 1
-            apply_and_save()
+        st.button(
+            "New Round", width="stretch", type="primary",
+            on_click=apply_and_save, args=(round_action, True)
+        )
+
+        st.button(
+            "Split to Jack", width="stretch",
+            on_click=apply_and_save,
+            args=({"player": game["dealer_index"], "points": 2}, True)
+        )
 
-        if st.button("Split to Jack", width="stretch"):
-            record_history()
-            game["scores"][game["dealer_index"]] += 2
-            apply_and_save()
+# The pegging engine scores each card against the pile as it is played. It
+# is kept in session state between taps and only rebuilt from the saved
+# pegging_pile when another device has changed it.
 
-    st.divider()
+def pegging_engine(game):
+    names = game.get("pegging_pile", [])
+    engine = st.session_state.get("pegging")
 
-    for i, player in enumerate(game["players"]):
-        with st.container(border=True):
-            col1, col2 = st.columns(2)
-            col1.subheader(player)
-            col2.markdown(f"### {game['scores'][i]}")
+    if engine is None or len(engine.cards) != len(names) or (
+        names and card_name(engine.cards[-1]) != names[-1]
+    ):
+        engine = PeggingPile.from_state(names)
+        st.session_state.pegging = engine
 
-            def add_score(points):
-                record_history()
-                game["scores"][i] += points
-                apply_and_save()
+    return engine
 
-            col1, col2, col3 = st.columns(3)
+def card_action(game, player, card):
+    name = card_name(card)
+    if name in played_cards(game):
+        st.toast(f"{name} has already been played.", icon="⚠️")
+        return None
 
-            with col1:
-                if st.button("Made 15", key=f"15_{i}", width="stretch"):
-                    add_score(2)
+    engine = pegging_engine(game)
+    if not engine.can_play(card):
+        st.toast("That card would take the count past 31.", icon="⚠️")
+        return None
 
-            with col2:
-                if st.button("Made 31", key=f"31_{i}", width="stretch"):
-                    add_score(2)
+    return {"player": player, "points": engine.play(card), "card": name}
 
-            with col3:
-                if st.button("Pair", key=f"pair_{i}", width="stretch"):
-                    add_score(2)
+def go_action(game, player):
+    pile = game.get("pegging_pile", [])
+    if not pile:
+        return None
 
-            col1, col2, col3 = st.columns(3)
+    count = game.get("pegging_count", 0)
+    # One for the go, unless 31 has already been scored
+    points = 1 if 0 < count < 31 else 0
+    return {"player": player, "points": points, "pile": list(pile)}
 
-            with col1:
-                if st.button("Triple", key=f"triple_{i}", width="stretch"):
-                    add_score(6)
+def play_card(player, card):
+    apply_and_save(lambda game: card_action(game, player, card), True)
 
-            with col2:
-                if st.button("3 in a Row", key=f"run_{i}", width="stretch"):
-                    add_score(6)
+def end_count(player):
+    apply_and_save(lambda game: go_action(game, player), True)
 
-            with col3:
-                if st.button("Prev. Couldn't Play", key=f"go_{i}", width="stretch"):
-                    add_score(1)
+@st.fragment
+def pegging_panel():
+    refresh_page_if_needed()
+    game = st.session_state.game
+    pile = game.get("pegging_pile", [])
+    played = played_cards(game)
+
+    with st.container(border=True):
+        st.markdown(f"#### Pegging Count: **{game.get('pegging_count', 0)}**")
+        st.caption(" ".join(pile) or "No cards played yet")
+
+        col1, col2 = st.columns(2)
+
+        player = col1.selectbox(
+            "Played By", range(len(game["players"])),
+            format_func=lambda i: game["players"][i], key="peg_player"
+        )
+        card = col2.selectbox(
+            "Card", [c for c in DECK if card_name(c) not in played],
+            format_func=card_name, index=None, key="peg_card"
+        )
+
+        col1, col2 = st.columns(2)
+
+        col1.button(
+            "Play Card", width="stretch", type="primary", disabled=card is None,
+            on_click=play_card, args=(player, card)
+        )
+        col2.button(
+            "Go / Reset", width="stretch", disabled=not pile,
+            help="Go point to the player picked above, then start a new count",
+            on_click=end_count, args=(player,)
+        )
+
+def win_row(game):
+    """Each player's win chance as shown, or None if there's no table."""
+    chances = win_probabilities(game["scores"], game["dealer_index"])
+    return chances and [f"{chance:.0%}" for chance in chances]
+
+def show_win_chances(game):
+    chances = win_row(game)
+    if chances is None:
+        return
+
+    for col, player, chance in zip(st.columns(len(chances)), game["players"], chances):
+        col.metric(f"{player} Win %", chance)
+
+@st.fragment
+def player_panel(i):
+    refresh_page_if_needed()
+    game = st.session_state.game
+
+    def score_button(column, label, key, points):
+        column.button(
+            label, key=f"{key}_{i}", width="stretch",
+            on_click=apply_and_save, args=({"player": i, "points": points},)
+        )
+
+    with st.container(border=True):
+        col1, col2 = st.columns(2)
+        col1.subheader(game["players"][i])
+        col2.markdown(f"### {game['scores'][i]}")
+
+        col1, col2, col3 = st.columns(3)
+        score_button(col1, "Made 15", "15", 2)
+        score_button(col2, "Made 31", "31", 2)
+        score_button(col3, "Pair", "pair", 2)
+
+        col1, col2, col3 = st.columns(3)
+        score_button(col1, "Triple", "triple", 6)
+        score_button(col2, "3 in a Row", "run", 6)
+        score_button(col3, "Prev. Couldn't Play", "go", 1)
+
+        with st.expander("Count Hand"):
+            hand = st.multiselect(
+                "Hand", DECK, format_func=card_name, max_selections=4, key=f"hand_{i}"
+            )
+            starter = st.selectbox(
+                "Starter", [card for card in DECK if card not in hand],
+                format_func=card_name, index=None, key=f"starter_{i}"
+            )
+            crib = i == game["dealer_index"] and st.checkbox("Crib", key=f"crib_{i}")
+
+            if len(hand) == 4 and starter is not None:
+                points = lookup_score(hand, starter, crib)
+                st.button(
+                    f"Add {points} Points", key=f"count_{i}", width="stretch",
+                    disabled=points == 0,
+                    on_click=apply_and_save, args=({"player": i, "points": points},)
+                )
+
+        with st.expander("Best Discard"):
+            dealt = st.multiselect(
+                "Dealt Cards", DECK, format_func=card_name, max_selections=6, key=f"dealt_{i}"
+            )
+
+            if len(dealt) == 6:
+                dealer = i == game["dealer_index"]
+                for option in best_discards(dealt, dealer)[:3]:
+                    throw = " ".join(card_name(c) for c in option["throw"])
+                    crib = option["crib"] if dealer else -option["crib"]
+                    st.markdown(
+                        f"Throw **{throw}** — hand {option['hand']:.1f}, "
+                        f"crib {crib:+.1f}, total **{option['total']:.1f}**"
+                    )
+
+def game_screen():
+    game = st.session_state.game
+    pin = st.session_state.current_pin
+
+    st.title("🃏 Cribbage Tracker")
+
+    dealer_controls()
+
+    show_win_chances(game)
+
+    pegging_panel()
+
+    st.divider()
+
+    for i in range(len(game["players"])):
+        player_panel(i)
 
     st.divider()
 
@@ -308,11 +1279,17 @@ def game_screen():
 
     with col1:
         if st.button("Finish Game", type="primary", width="stretch", icon="🛑"):
-            update_leaderboard(game)
-            delete_game(pin)
-            st.session_state.page = "leaderboard"
-            st.session_state.game = None
-            st.rerun()
+            try:
+                finish_game(pin, game)
+            except TimeoutError:
+                st.error("Saving is taking too long. Try again in a moment.")
+            else:
+                # Also where a device lands if the game was already finished
+                # or expired elsewhere; its scores are only banked once
+                st.session_state.page = "leaderboard"
+                st.session_state.game = None
+                st.session_state.current_pin = None
+                st.rerun()
 
     with col2:
         if st.button("Undo", width="stretch", icon="🔄"):
@@ -324,6 +1301,64 @@ def game_screen():
         st.session_state.current_pin = None
         st.rerun()
 
+# =====================================================
+# WATCH SCREEN
+# =====================================================
+
+@st.fragment(run_every=WATCH_REFRESH_SECONDS)
+def scoreboard(pin):
+    # Only the version probe runs every tick; the game is reloaded on change
+    probe = probe_game(pin)
+
+    if probe is None:
+        st.info("This game has finished or expired.")
+        return
+
+    version, game_id, updated_at = probe
+    game = st.session_state.watch_game
+
+    if game is None or game["version"] != version or game["game_id"] != game_id:
+        game = get_game(pin, probe)
+        st.session_state.watch_game = game
+        if game is None:
+            st.info("This game has finished or expired.")
+            return
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown(f"### Round {game['round']}")
+
+    with col2:
+        st.markdown(f"### Game PIN: {pin}")
+
+    with st.container(border=True):
+        dealer = game["players"][game["dealer_index"]]
+        st.markdown(f"#### Dealer: **{dealer}**")
+
+    show_win_chances(game)
+
+    for i, player in enumerate(game["players"]):
+        with st.container(border=True):
+            col1, col2 = st.columns(2)
+            col1.subheader(player)
+            col2.markdown(f"### {game['scores'][i]}")
+
+    st.caption(f"Last update: {updated_at[:19].replace('T', ' ')} UTC")
+
+def watch_screen():
+    st.title("🃏 Cribbage Tracker")
+
+    scoreboard(st.session_state.current_pin)
+
+    st.divider()
+
+    if st.button("Exit to PIN", width="stretch", icon="🗑️"):
+        st.session_state.page = "pin"
+        st.session_state.watch_game = None
+        st.session_state.current_pin = None
+        st.rerun()
+
 # =====================================================
 # LEADERBOARD SCREEN
 # =====================================================
@@ -331,14 +1366,30 @@ def game_screen():
 def leaderboard_screen():
     st.title("🏆 Cribbage All-Time Leaderboard")
 
-    rows = get_leaderboard()
+    ranking = current_ranking()
 
-    if not rows:
+    if not len(ranking):
         st.info("No games recorded yet.")
         return
 
-    df = pd.DataFrame(rows, columns=["Player", "Overall Score"])
-    df.insert(0, "Position", range(1, len(df) + 1))
+    name = st.text_input("Find my rank").strip().title()
+    if name:
+        found = ranking.rank(name)
+        if found:
+            rank, points = found
+            st.success(f"**{name}** is ranked **#{rank}** of {len(ranking)} with {points} points.")
+            st.session_state.leaderboard_page = ranking.index(name) // LEADERBOARD_PAGE_SIZE + 1
+        else:
+            st.warning(f"No games recorded for {name}.")
+
+    pages = (len(ranking) - 1) // LEADERBOARD_PAGE_SIZE + 1
+    page = min(st.session_state.get("leaderboard_page", 1), pages)
+    if pages > 1:
+        page = st.number_input("Page", min_value=1, max_value=pages, value=page, step=1)
+        st.session_state.leaderboard_page = page
+
+    rows = ranking.page((page - 1) * LEADERBOARD_PAGE_SIZE, LEADERBOARD_PAGE_SIZE)
+    df = pd.DataFrame(rows, columns=["Position", "Player", "Overall Score"])
 
     st.data_editor(
         df,
@@ -385,5 +1436,7 @@ elif st.session_state.page == "create":
     create_game_screen()
 elif st.session_state.page == "game":
     game_screen()
+elif st.session_state.page == "watch":
+    watch_screen()
 else:
     leaderboard_screen()
\ No newline at end of file
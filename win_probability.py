@@ -0,0 +1,107 @@
+import os
+
+import numpy as np
+
+from scoring import WINNING_SCORE
+
+# =====================================================
+# TABLE
+# =====================================================
+
+# P(win) indexed [my score, opponent score, I deal], at the start of a
+# hand. Built offline from simulator tallies with
+#   python simulator.py --games N
+#   python win_probability.py
+# and loaded once per process by the app.
+
+STATS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "win_stats.npz")
+TABLE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "win_probability.npy")
+
+# Sparse cells lean on the win rate of the surrounding BIN x BIN block,
+# weighted as if it were PRIOR_GAMES extra games. Blocks the simulator
+# rarely reached lean in turn on a race model fitted to all the games: a
+# logistic curve in the points-to-go gap, scaled by the points left.
+BIN = 5
+PRIOR_GAMES = 20
+
+def race_model(visits, wins):
+    mine, theirs, deals = np.meshgrid(
+        np.arange(WINNING_SCORE), np.arange(WINNING_SCORE), np.arange(2), indexing="ij"
+    )
+    my_left = WINNING_SCORE - mine
+    their_left = WINNING_SCORE - theirs
+    gap = (their_left - my_left) / np.sqrt(my_left + their_left)
+
+    def predict(slope, dealer_edge):
+        return 1 / (1 + np.exp(-(slope * gap + dealer_edge * (2 * deals - 1))))
+
+    # Coarse grid search on the log loss; two parameters don't need more
+    best = None
+    for slope in np.linspace(0.05, 1.5, 59):
+        for dealer_edge in np.linspace(0, 0.5, 26):
+            p = np.clip(predict(slope, dealer_edge), 1e-6, 1 - 1e-6)
+            loss = -(wins * np.log(p) + (visits - wins) * np.log(1 - p)).sum()
+            if best is None or loss < best[0]:
+                best = (loss, slope, dealer_edge)
+
+    return predict(best[1], best[2])
+
+def build_table(stats_path=STATS_FILE, path=TABLE_FILE):
+    stats = np.load(stats_path)
+    visits = stats["visits"].astype(np.float64)
+    wins = stats["wins"].astype(np.float64)
+
+    def block_sums(counts):
+        bins = -(-WINNING_SCORE // BIN)
+        padded = np.zeros((bins * BIN, bins * BIN, 2))
+        padded[:WINNING_SCORE, :WINNING_SCORE] = counts
+        sums = padded.reshape(bins, BIN, bins, BIN, 2).sum(axis=(1, 3))
+        return sums.repeat(BIN, axis=0).repeat(BIN, axis=1)[:WINNING_SCORE, :WINNING_SCORE]
+
+    model = race_model(visits, wins)
+    block = (block_sums(wins) + PRIOR_GAMES * model) / (block_sums(visits) + PRIOR_GAMES)
+    table = (wins + PRIOR_GAMES * block) / (visits + PRIOR_GAMES)
+
+    np.save(path, table.astype(np.float32))
+
+# =====================================================
+# LOOKUP
+# =====================================================
+
+_table = None
+
+def load_table(path=TABLE_FILE):
+    """The table, or None if it hasn't been built."""
+    global _table
+    if _table is None and os.path.exists(path):
+        _table = np.load(path, mmap_mode="r")
+    return _table
+
+def win_probabilities(scores, dealer_index):
+    """Each player's chance of winning from the current scores.
+
+    Exact for two players. With more, each player's head-to-head chances
+    against every opponent are multiplied and the results normalised.
+    Returns None when no table has been built.
+    """
+    table = load_table()
+    if table is None:
+        return None
+
+    if max(scores) >= WINNING_SCORE:
+        return [float(score == max(scores)) for score in scores]
+
+    strength = []
+    for i, mine in enumerate(scores):
+        chance = 1.0
+        for j, theirs in enumerate(scores):
+            if j != i:
+                chance *= float(table[mine, theirs, int(i == dealer_index)])
+        strength.append(chance)
+
+    total = sum(strength)
+    return [chance / total for chance in strength]
+
+if __name__ == "__main__":
+    build_table()
+    print(f"Wrote {TABLE_FILE}")
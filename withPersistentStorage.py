@@ -1,8 +1,10 @@
 import streamlit as st
 from streamlit_js_eval import streamlit_js_eval
-import json
 import random
 
+from codec import decode_text, encode_text
+from write_behind import WRITE_INTERVAL_SECONDS, discard, flush_soon, mark_dirty, take
+
 # Unique key in localStorage
 LS_KEY = "cribbage_game"# ===================================
 # LOCAL STORAGE HELPERS
@@ -11,17 +13,27 @@ def load_game():
     data = streamlit_js_eval(js_expressions=f"localStorage.getItem('{LS_KEY}')", key="load_game")
     if data:
         try:
-            return json.loads(data)
-        except json.JSONDecodeError:
+            return decode_text(data)
+        except (ValueError, KeyError, IndexError):
             return None
     return None
 
 def save_game(game):
-    json_data = json.dumps(game)
-    # Overwrite the same key each time
-    streamlit_js_eval(js_expressions=f"localStorage.setItem('{LS_KEY}', `{json_data}`)", key="save_game")
+    # Buffered; storage_writer writes st.session_state.game
+    mark_dirty(LS_KEY)
+
+@st.fragment(run_every=WRITE_INTERVAL_SECONDS)
+def storage_writer():
+    game = st.session_state.game
+    if not game:
+        return
+    text_data = take(LS_KEY, lambda: encode_text(game))
+    if text_data is not None:
+        # Overwrite the same key each time
+        streamlit_js_eval(js_expressions=f"localStorage.setItem('{LS_KEY}', `{text_data}`)", key="save_game")
 
 def clear_game():
+    discard(LS_KEY)
     streamlit_js_eval(js_expressions=f"localStorage.removeItem('{LS_KEY}')", key="clear_game")
 
 # ===================================
@@ -165,6 +177,7 @@ def game_page():
     col1, col2 = st.columns(2)
     with col2:
         if st.button("How to Play", use_container_width=True, icon="❓"):
+            flush_soon(LS_KEY)
             st.session_state.page = "rules"
             st.rerun()
     with col1:
@@ -183,4 +196,6 @@ if st.session_state.page == "rules":
 elif st.session_state.page == "landing":
     landing_page()
 else:
-    game_page()
\ No newline at end of file
+    game_page()
+
+storage_writer()
\ No newline at end of file
@@ -0,0 +1,56 @@
+import time
+
+import streamlit as st
+
+# =====================================================
+# WRITE-BEHIND BUFFER
+# =====================================================
+
+# Score taps only mark the game dirty. A storage_writer fragment in each app
+# runs at the end of every script run and every WRITE_INTERVAL_SECONDS, and
+# asks take() whether to write. A burst of taps becomes one localStorage
+# write, which is skipped when the serialized state hasn't changed since
+# the last one.
+#
+# Buffers live in session state, one per localStorage key.
+
+WRITE_INTERVAL_SECONDS = 2
+
+def _buffer(name):
+    buffers = st.session_state.setdefault("_write_behind", {})
+    if name not in buffers:
+        buffers[name] = {"dirty": False, "force": False, "written": None, "written_at": 0.0}
+    return buffers[name]
+
+def mark_dirty(name):
+    _buffer(name)["dirty"] = True
+
+def flush_soon(name):
+    """Write on the next take() without waiting out the interval, e.g. on
+    page navigation."""
+    buf = _buffer(name)
+    buf["force"] = buf["dirty"]
+
+def discard(name):
+    """Drop pending state after the stored copy has been deleted."""
+    st.session_state.setdefault("_write_behind", {}).pop(name, None)
+
+def take(name, encode):
+    """The text to write now, or None if the buffer is clean, the last write
+    was too recent, or encode() gives the text already written."""
+    buf = _buffer(name)
+    if not buf["dirty"]:
+        return None
+
+    now = time.monotonic()
+    if not buf["force"] and now - buf["written_at"] < WRITE_INTERVAL_SECONDS:
+        return None
+
+    buf["dirty"] = buf["force"] = False
+    text = encode()
+    if text == buf["written"]:
+        return None
+
+    buf["written"] = text
+    buf["written_at"] = now
+    return text